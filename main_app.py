@@ -1,40 +1,264 @@
-import src.transform_sp_excel_performance_to_json as transform_sp_excel_performance_to_json
-import src.transform_sp_json_to_eval_report_json as transform_sp_json_to_eval_report_json
-import src.generate_html_reports as generate_html_reports
-import src.generate_doc_from_html as generate_doc_from_html
-# import src.generate_pdf_from_html_with_playwright as generate_pdf_from_html_with_playwright
-import src.generate_pdf_from_doc as generate_pdf_from_doc
+# Only lightweight modules are imported up front. Stage modules (and with them
+# Playwright, python-docx, docx2pdf, openpyxl) are imported through
+# pipeline_config.import_stage() when their stage actually runs.
+import src.render_work_queue as render_work_queue
+import src.pipeline_checkpoint as pipeline_checkpoint
+import src.pipeline_config as pipeline_config
+from src.pipeline_config import import_stage
 
+import argparse
+
+
+STAGE_TITLES = {
+    'excel': "[Stage 1/6] Excel → Aggregate JSON",
+    'reports': "[Stage 2/6] Aggregate JSON → Individual Report JSONs",
+    'validate': "[Check] Individual Report JSONs → Schema Validation",
+    'html': "[Stage 3/6] Individual JSONs → HTML Reports",
+    'doc': "[Stage 4/6] HTML → DOC Reports",
+    'pdf': "[Stage 5/6] DOC → PDF Reports (docx2pdf)",
+}
+PLAYWRIGHT_PDF_TITLE = "[Stage 5/6] HTML → PDF Reports (Playwright)"
+BUNDLE_PDF_TITLE = "[Stage 5/6] Team Bundles → PDF Reports (Playwright, one print job per team)"
+PACKAGE_TITLE = "[Stage 6/6] DOC/PDF Reports → Team ZIP Archives"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="main_app.py", description="Performance Report Generator")
+    parser.add_argument('--config', default=None,
+                        help=f"JSON config file (default: {pipeline_config.DEFAULT_CONFIG_PATH})")
+
+    run_group = parser.add_argument_group("pipeline selection (override the config file)")
+    run_group.add_argument('--stages', nargs='+', choices=pipeline_config.STAGES, default=None,
+                           help="Stages to run, e.g. --stages html doc")
+    run_group.add_argument('--members', nargs='+', default=None,
+                           help="Only process these members (names or report stems, e.g. 'Hanan Aljabri')")
+    run_group.add_argument('--formats', nargs='+', choices=pipeline_config.OUTPUT_FORMATS, default=None,
+                           help="Output formats to produce; stages not needed for them are skipped")
+    run_group.add_argument('--pdf-backend', choices=pipeline_config.PDF_BACKENDS, default=None,
+                           help="docx2pdf converts the DOC reports, playwright prints the HTML reports, "
+                                "playwright_bundle prints one document per team and splits it per member")
+    run_group.add_argument('--chart-format', choices=pipeline_config.CHART_FORMATS, default=None,
+                           help="DOC reports: 'image' embeds a screenshot of the HTML chart, "
+                                "'native' draws a Word chart from the sprint data (smaller, no browser)")
+    run_group.add_argument('--team-name', default=None, help="Team label printed on the reports")
+    run_group.add_argument('--source-json', default=None, help="Aggregate team JSON read by stage 2")
+    run_group.add_argument('--stream', dest='stream_reports', action='store_true', default=None,
+                           help="Stage 2: parse the aggregate JSON incrementally with memory bounded per member")
+    run_group.add_argument('--months', nargs='+', default=None,
+                           help="Target months for stage 2, e.g. --months 'April 2025' 'May 2025'")
+
+    run_group.add_argument('--regenerate', action='store_true',
+                           help="Rebuild the selected stages for --members only, ignoring checkpoints "
+                                "(the report JSON only with --stages reports ...)")
+
+    perf_group = parser.add_argument_group("workers and retries")
+    perf_group.add_argument('--pipelined', action='store_true', default=None,
+                            help="Run stages 3-5 per member with overlapping stages instead of stage barriers")
+    perf_group.add_argument('--cpu-workers', type=int, default=None,
+                            help="Processes for HTML/DOC rendering in --pipelined mode (default: CPU count)")
+    perf_group.add_argument('--browser-slots', type=int, default=None,
+                            help="Concurrent Chromium instances in --pipelined mode")
+    perf_group.add_argument('--converter-slots', type=int, default=None,
+                            help="Concurrent docx2pdf conversions in --pipelined mode")
+    perf_group.add_argument('--html-workers', type=int, default=None,
+                            help="Processes for stage 3 HTML rendering (default: CPU count, for large cohorts)")
+    perf_group.add_argument('--archive-workers', type=int, default=None,
+                            help="Threads reading and checksumming reports for the package stage")
+    perf_group.add_argument('--retries', type=int, default=None,
+                            help="Retries for flaky browser and converter steps")
+    perf_group.add_argument('--retry-backoff', type=float, default=None,
+                            help="Initial retry delay in seconds (doubles after each attempt)")
+    perf_group.add_argument('--no-fsync', dest='fsync_writes', action='store_false', default=None,
+                            help="Skip fsync on report writes (faster, but not crash-safe)")
+    perf_group.add_argument('--fresh', action='store_true',
+                            help="Discard the checkpoint journal and process every item again")
+
+    queue_group = parser.add_argument_group("sharded rendering")
+    queue_group.add_argument('--enqueue', action='store_true',
+                             help="Queue every member in individual_reports/ for sharded rendering and exit")
+    queue_group.add_argument('--worker', action='store_true',
+                             help="Claim queued members and render HTML/DOC/PDF until the queue is drained")
+    queue_group.add_argument('--retry-failed', action='store_true',
+                             help="With --enqueue, give members parked as failed a fresh attempt budget")
+    queue_group.add_argument('--reset-queue', action='store_true',
+                             help="With --enqueue, queue every member again, including finished ones")
+    queue_group.add_argument('--queue-db', default=str(render_work_queue.QUEUE_DB_PATH),
+                             help="Path of the shared SQLite queue file")
+    queue_group.add_argument('--shard-size', type=int, default=render_work_queue.DEFAULT_SHARD_SIZE,
+                             help="Number of members a worker claims at a time")
+    return parser.parse_args(argv)
+
+
+def build_config(args):
+    """Layer command line options over the config file."""
+    config = pipeline_config.load_config(args.config)
+    config = pipeline_config.merge_config(config, {
+        'stages': args.stages,
+        'members': args.members,
+        'output_formats': args.formats,
+        'pdf_backend': args.pdf_backend,
+        'chart_format': args.chart_format,
+        'team_name': args.team_name,
+        'source_json': args.source_json,
+        'target_months': args.months,
+        'pipelined': args.pipelined,
+        'workers': {
+            'cpu_workers': args.cpu_workers,
+            'browser_slots': args.browser_slots,
+            'converter_slots': args.converter_slots,
+            'archive_workers': args.archive_workers,
+            'html_workers': args.html_workers,
+        },
+        'retries': args.retries,
+        'retry_backoff_seconds': args.retry_backoff,
+        'fsync_writes': args.fsync_writes,
+        'stream_reports': args.stream_reports,
+    })
+    pipeline_config.validate_config(config)
+    return config
+
+
+def run_work_queue(args, config):
+    members = pipeline_config.member_stems(config['members'])
+    if args.enqueue:
+        added = render_work_queue.enqueue_members(args.queue_db, retry_failed=args.retry_failed, members=members,
+                                                  reset=args.reset_queue)
+        print(f"Queued {added} member(s) in {args.queue_db}")
+    if args.worker:
+        render_work_queue.run_worker(args.queue_db, shard_size=args.shard_size,
+                                     pdf_backend=config['pdf_backend'], output_formats=config['output_formats'])
+    print(f"Queue status: {render_work_queue.queue_status(args.queue_db)}")
+
+
+def run_pipeline(config, journal):
+    stages = pipeline_config.select_stages(config)
+    members = pipeline_config.member_stems(config['members'])
+    print(f"Stages: {', '.join(stages) or 'none'}"
+          + (f" | Members: {', '.join(sorted(members))}" if members else ""))
 
-if __name__ == '__main__':
-    print("=" * 60)
-    print("Performance Report Generator - Full Pipeline")
-    print("=" * 60)
-    
     # Step 1: Transform Sharepoint Excel performance data to JSON
-    print("\n[Stage 1/6] Excel → Aggregate JSON")
-    # transform_sp_excel_performance_to_json.main()
+    if 'excel' in stages:
+        print("\n" + STAGE_TITLES['excel'])
+        import_stage('src.transform_sp_excel_performance_to_json').main(journal)
 
     # Step 2: Transform JSON data in step 1 to evaluation report JSON data
-    print("\n[Stage 2/6] Aggregate JSON → Individual Report JSONs")
-    # transform_sp_json_to_eval_report_json.main()
+    if 'reports' in stages:
+        print("\n" + STAGE_TITLES['reports'])
+        import_stage('src.transform_sp_json_to_eval_report_json').main(journal, members)
+
+    # Fail fast: stop before any rendering work if a report JSON is malformed
+    if 'validate' in stages:
+        print("\n" + STAGE_TITLES['validate'])
+        invalid = import_stage('src.validate_report_json').main(journal, members)
+        if invalid:
+            raise SystemExit(f"\nStopping before rendering: {len(invalid)} report JSON(s) failed schema validation")
+
+    # Step 6 starts before rendering: finished reports stream into the team
+    # archives as they are written, and the archives are closed at the end.
+    packager = None
+    if 'package' in stages:
+        packager = import_stage('src.package_report_archives').ReportArchivePackager(
+            workers=config['workers']['archive_workers'])
+        packager.start_streaming()
+
+    run_render_stages(config, journal, stages, members, packager)
+
+    if packager:
+        print("\n" + PACKAGE_TITLE)
+        packager.finish(journal)
+
+
+def run_render_stages(config, journal, stages, members, packager=None):
+    bundle_pdf = config['pdf_backend'] == 'playwright_bundle'
+    render_stages = [stage for stage in stages if stage in ('html', 'doc', 'pdf')]
+    if config['pipelined'] and render_stages:
+        # Steps 3-5 overlapped: each member flows HTML → DOC → PDF independently.
+        # Team bundles are printed per team, so they run once the members are done.
+        print("\n[Stages 3-5/6] Individual JSONs → HTML → DOC → PDF (pipelined)")
+        workers = config['workers']
+        pipeline_scheduler = import_stage('src.pipeline_scheduler')
+        pipeline_scheduler.run_pipelined(members=members, pdf_backend=config['pdf_backend'],
+                                         cpu_workers=workers['cpu_workers'], browser_slots=workers['browser_slots'],
+                                         converter_slots=workers['converter_slots'], journal=journal,
+                                         stages=[stage for stage in render_stages if not (bundle_pdf and stage == 'pdf')],
+                                         config=config, on_artifact=packager.add if packager else None)
+        if bundle_pdf and 'pdf' in render_stages:
+            print("\n" + BUNDLE_PDF_TITLE)
+            import_stage('src.generate_cohort_pdf_bundle').main(journal, members)
+        return
 
     # Step 3: Use the evaluation report JSON data to generate .html reports for all team members
-    print("\n[Stage 3/6] Individual JSONs → HTML Reports")
-    generate_html_reports.main()
+    if 'html' in stages:
+        print("\n" + STAGE_TITLES['html'])
+        import_stage('src.generate_html_reports').main(journal, members)
 
     # Step 4: Generate DOC reports for all HTML reports
-    print("\n[Stage 4/6] HTML → DOC Reports")
-    generate_doc_from_html.main()
+    if 'doc' in stages:
+        print("\n" + STAGE_TITLES['doc'])
+        import_stage('src.generate_doc_from_html').main(journal, members)
+
+    # Step 5: Generate PDFs from DOC reports for consistent formatting, or from
+    # HTML reports with Playwright (alternative and independent method)
+    if 'pdf' in stages:
+        if bundle_pdf:
+            print("\n" + BUNDLE_PDF_TITLE)
+            import_stage('src.generate_cohort_pdf_bundle').main(journal, members)
+        elif config['pdf_backend'] == 'playwright':
+            print("\n" + PLAYWRIGHT_PDF_TITLE)
+            import_stage('src.generate_pdf_from_html_with_playwright').main(journal, members)
+        else:
+            print("\n" + STAGE_TITLES['pdf'])
+            import_stage('src.generate_pdf_from_doc').main(journal, members)
+
+
+def main(argv=None):
+    """Run the pipeline for the given command line; returns the exit code.
+
+    Long-running callers (``src.pipeline_daemon``) call this once per job.
+    """
+    args = parse_args(argv)
+    config = build_config(args)
+    pipeline_config.apply_config(config)
+
+    if args.enqueue or args.worker:
+        run_work_queue(args, config)
+        return 0
+
+    pipeline_checkpoint.configure_retries(config['retries'], config['retry_backoff_seconds'])
+    journal = pipeline_checkpoint.CheckpointJournal()
+    if args.fresh:
+        journal.reset()
 
-    # Step 5: Generate PDFs from DOC reports for consistent formatting (alternative but dependant method)
-    print("\n[Stage 5/6] DOC → PDF Reports (docx2pdf)")
-    generate_pdf_from_doc.main()
+    if args.regenerate:
+        if not config['members']:
+            raise SystemExit("--regenerate needs --members (or 'members' in the config file)")
+        regenerate_members = import_stage('src.regenerate_members')
+        # Only the requested stages: the member JSON is rebuilt from the
+        # aggregate only when 'reports' is asked for, keeping hand edits.
+        stages = [stage for stage in pipeline_config.select_stages(config)
+                  if stage in regenerate_members.REGENERATION_STAGES]
+        regenerated = regenerate_members.regenerate_members(config['members'], stages=stages,
+                                                            pdf_backend=config['pdf_backend'], journal=journal)
+        print(f"\nRegenerated {len(regenerated)} member(s)")
+        return 0 if len(regenerated) == len(pipeline_config.member_stems(config['members'])) else 1
+
+    print("=" * 60)
+    print("Performance Report Generator - Full Pipeline")
+    print("=" * 60)
+
+    run_pipeline(config, journal)
+
+    failed_items = journal.failed_items()
+    if failed_items:
+        print(f"\n{len(failed_items)} item(s) failed and will be retried on the next run:")
+        for stage, item, error in failed_items:
+            print(f"  ✗ [{stage}] {item}: {error}")
 
-    # Step Optional: Generate PDFs from HTML reports (alternative and independent method)
-    # print("\n[Stage (Optional)] HTML → PDF Reports (Playwright)")
-    # generate_pdf_from_html_with_playwright.main()
-    
     print("\n" + "=" * 60)
     print("Pipeline execution complete!")
-    print("=" * 60)
\ No newline at end of file
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
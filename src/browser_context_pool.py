@@ -0,0 +1,189 @@
+"""Pre-warmed Playwright browser contexts shared by the browser stages.
+
+Launching Chromium and loading each report from ``file:///`` used to cost a
+browser start, a disk lookup and a CDN round trip for Chart.js per member.
+``BrowserContextPool`` keeps one browser and a few ready contexts per process:
+
+- every context has a fixed viewport and the same request routing;
+- routing serves scripts, stylesheets and fonts from a local asset cache and
+  aborts every other request, so a render never waits on the network once an
+  asset has been fetched the first time;
+- reports are loaded with ``page.set_content()`` from the rendered HTML string,
+  and Chart.js animation is skipped so the chart is final as soon as it exists.
+
+Playwright's sync API is bound to the thread that started it, so each process
+(and thread) uses its own pool through ``get_pool()``.
+"""
+
+import atexit
+import hashlib
+import mimetypes
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlparse
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+# Scripts, stylesheets and fonts pulled by the report template (Chart.js) are
+# kept here after their first fetch; drop files in to run fully offline.
+ASSET_CACHE_DIR = BASE_DIR / 'transformed_data' / 'browser_asset_cache'
+
+DEFAULT_POOL_SIZE = 2
+VIEWPORT = {'width': 1280, 'height': 1024}
+# Contexts are recycled after this many pages to keep renderer memory flat.
+MAX_PAGES_PER_CONTEXT = 50
+CACHED_RESOURCE_TYPES = {'script', 'stylesheet', 'font'}
+# Fallback settle time if a page has no Chart.js charts to finish.
+CHART_SETTLE_MS = 500
+
+_FINISH_CHARTS_JS = """
+() => {
+    if (!window.Chart || !Chart.instances) { return false; }
+    Object.values(Chart.instances).forEach((chart) => {
+        chart.options.animation = false;
+        chart.stop();
+        chart.update('none');
+    });
+    return true;
+}
+"""
+
+
+def _asset_cache_path(url):
+    suffix = Path(urlparse(url).path).suffix or '.bin'
+    return Path(ASSET_CACHE_DIR) / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}{suffix}"
+
+
+class BrowserContextPool:
+    """One Chromium instance with a set of reusable, pre-routed contexts."""
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, viewport=None):
+        from playwright.sync_api import sync_playwright
+
+        self.size = max(1, size)
+        self.viewport = viewport or VIEWPORT
+        self._assets = {}
+        self._playwright = sync_playwright().start()
+        self._browser = None
+        self._idle = []
+        try:
+            self._launch()
+        except Exception:
+            self._playwright.stop()
+            raise
+
+    def _launch(self):
+        self._browser = self._playwright.chromium.launch()
+        self._idle = [self._new_context() for _ in range(self.size)]
+
+    def _new_context(self):
+        context = self._browser.new_context(viewport=self.viewport)
+        context.route('**/*', self._route)
+        # Pages are created up front so acquiring one costs nothing.
+        return [context, context.new_page(), 0]
+
+    def _route(self, route):
+        request = route.request
+        url = request.url
+        if url.startswith(('data:', 'blob:', 'about:')):
+            route.continue_()
+            return
+        if request.resource_type not in CACHED_RESOURCE_TYPES or not url.startswith(('http://', 'https://')):
+            route.abort()
+            return
+
+        body = self._assets.get(url)
+        if body is None:
+            cache_path = _asset_cache_path(url)
+            if cache_path.exists():
+                body = cache_path.read_bytes()
+            else:
+                # First use of this asset on this machine: fetch it once.
+                try:
+                    response = route.fetch()
+                except Exception as e:
+                    # Offline with an empty cache: fail the request at once, as
+                    # the old file:// page did, instead of leaving it pending
+                    # until the page load times out. The chart is just missing.
+                    print(f"✗ Could not fetch {url} ({e.__class__.__name__}); rendering without it")
+                    route.abort()
+                    return
+                if not response.ok:
+                    route.fulfill(response=response)
+                    return
+                body = response.body()
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                cache_path.write_bytes(body)
+            self._assets[url] = body
+        content_type = mimetypes.guess_type(urlparse(url).path)[0] or (
+            'application/javascript' if request.resource_type == 'script' else 'application/octet-stream')
+        route.fulfill(status=200, body=body, headers={'Content-Type': content_type,
+                                                      'Access-Control-Allow-Origin': '*'})
+
+    @contextmanager
+    def page(self):
+        """Lend a ready page; it is returned to the pool, or replaced if it failed."""
+        if not self._browser.is_connected():
+            self._launch()
+        slot = self._idle.pop() if self._idle else self._new_context()
+        try:
+            yield slot[1]
+        except Exception:
+            slot[0].close()
+            raise
+        slot[2] += 1
+        if slot[2] >= MAX_PAGES_PER_CONTEXT or len(self._idle) >= self.size:
+            slot[0].close()
+            if len(self._idle) < self.size:
+                self._idle.append(self._new_context())
+        else:
+            self._idle.append(slot)
+
+    def load(self, page, html):
+        """Load a rendered report into ``page`` and finish drawing its charts."""
+        page.set_content(html, wait_until='load')
+        if not page.evaluate(_FINISH_CHARTS_JS):
+            page.wait_for_timeout(CHART_SETTLE_MS)
+
+    def render_pdf(self, html, **pdf_options):
+        """Print rendered report HTML to PDF and return the bytes."""
+        with self.page() as page:
+            self.load(page, html)
+            return page.pdf(**pdf_options)
+
+    def screenshot_element(self, html, selector):
+        """Return a PNG of the element matching ``selector``, or None if it is missing."""
+        with self.page() as page:
+            self.load(page, html)
+            element = page.query_selector(selector)
+            return element.screenshot() if element else None
+
+    def close(self):
+        for context, _, _ in self._idle:
+            context.close()
+        self._idle = []
+        if self._browser is not None:
+            self._browser.close()
+        self._playwright.stop()
+
+
+_pools = threading.local()
+
+
+def get_pool():
+    """Return this thread's pool, launching the browser on first use."""
+    pool = getattr(_pools, 'pool', None)
+    if pool is None:
+        pool = BrowserContextPool()
+        _pools.pool = pool
+        atexit.register(_close_pool, pool)
+    return pool
+
+
+def _close_pool(pool):
+    try:
+        pool.close()
+    except Exception:
+        # The browser may already be gone at interpreter exit.
+        pass
@@ -0,0 +1,137 @@
+"""Native Word bar charts for the DOCX reports.
+
+``add_bar_chart()`` embeds a DrawingML chart part (``word/charts/chartN.xml``)
+built straight from the report data, instead of a full-width PNG screenshot of
+the HTML canvas. The chart is a few kilobytes of XML rather than a ~100 KB
+image, stays sharp at any zoom and in the converted PDF, and needs no browser
+to produce. Word and LibreOffice draw it from the cached values stored in the
+part; no embedded workbook is written, so the data is not editable in Word.
+"""
+
+from xml.sax.saxutils import escape
+
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.packuri import PackURI
+from docx.opc.part import Part
+from docx.oxml import parse_xml
+from docx.shared import Cm
+
+
+CHART_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.drawingml.chart+xml'
+CHART_URI = 'http://schemas.openxmlformats.org/drawingml/2006/chart'
+
+# Same height as the chart container of the HTML report.
+DEFAULT_HEIGHT = Cm(7.9)
+
+_CHART_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<c:chartSpace xmlns:c="http://schemas.openxmlformats.org/drawingml/2006/chart"'
+    ' xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"'
+    ' xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<c:roundedCorners val="0"/>'
+    '<c:chart>'
+    '<c:autoTitleDeleted val="1"/>'
+    '<c:plotArea><c:layout/>'
+    '<c:barChart><c:barDir val="col"/><c:grouping val="clustered"/><c:varyColors val="0"/>'
+    '{series}'
+    '<c:gapWidth val="80"/>'
+    '<c:axId val="1001"/><c:axId val="1002"/>'
+    '</c:barChart>'
+    '<c:catAx><c:axId val="1001"/><c:scaling><c:orientation val="minMax"/></c:scaling>'
+    '<c:delete val="0"/><c:axPos val="b"/><c:numFmt formatCode="General" sourceLinked="0"/>'
+    '<c:majorTickMark val="none"/><c:minorTickMark val="none"/><c:tickLblPos val="nextTo"/>'
+    '<c:crossAx val="1002"/><c:crosses val="autoZero"/><c:auto val="1"/><c:lblAlgn val="ctr"/>'
+    '<c:lblOffset val="100"/><c:noMultiLvlLbl val="0"/></c:catAx>'
+    '<c:valAx><c:axId val="1002"/><c:scaling><c:orientation val="minMax"/><c:min val="0"/></c:scaling>'
+    '<c:delete val="0"/><c:axPos val="l"/>'
+    '<c:majorGridlines><c:spPr><a:ln w="6350"><a:solidFill><a:srgbClr val="E5E5E5"/></a:solidFill>'
+    '</a:ln></c:spPr></c:majorGridlines>'
+    '<c:numFmt formatCode="General" sourceLinked="0"/>'
+    '<c:majorTickMark val="none"/><c:minorTickMark val="none"/><c:tickLblPos val="nextTo"/>'
+    '<c:crossAx val="1001"/><c:crosses val="autoZero"/><c:crossBetween val="between"/></c:valAx>'
+    '</c:plotArea>'
+    '<c:legend><c:legendPos val="t"/><c:overlay val="0"/></c:legend>'
+    '<c:plotVisOnly val="1"/><c:dispBlanksAs val="gap"/>'
+    '</c:chart>'
+    '</c:chartSpace>'
+)
+
+_SERIES_XML = (
+    '<c:ser><c:idx val="{index}"/><c:order val="{index}"/>'
+    '<c:tx><c:v>{name}</c:v></c:tx>'
+    '<c:spPr><a:solidFill><a:srgbClr val="{fill}"><a:alpha val="{alpha}"/></a:srgbClr></a:solidFill>'
+    '<a:ln w="9525"><a:solidFill><a:srgbClr val="{fill}"/></a:solidFill></a:ln></c:spPr>'
+    '<c:invertIfNegative val="0"/>'
+    '<c:cat><c:strLit><c:ptCount val="{count}"/>{categories}</c:strLit></c:cat>'
+    '<c:val><c:numLit><c:formatCode>General</c:formatCode><c:ptCount val="{count}"/>{values}</c:numLit></c:val>'
+    '</c:ser>'
+)
+
+_INLINE_XML = (
+    '<wp:inline distT="0" distB="0" distL="0" distR="0"'
+    ' xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"'
+    ' xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"'
+    ' xmlns:c="http://schemas.openxmlformats.org/drawingml/2006/chart"'
+    ' xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<wp:extent cx="{cx}" cy="{cy}"/>'
+    '<wp:docPr id="{shape_id}" name="Chart {shape_id}"/>'
+    '<wp:cNvGraphicFramePr/>'
+    '<a:graphic><a:graphicData uri="' + CHART_URI + '">'
+    '<c:chart r:id="{rel_id}"/>'
+    '</a:graphicData></a:graphic>'
+    '</wp:inline>'
+)
+
+
+def _points(values, number=False):
+    points = []
+    for index, value in enumerate(values):
+        text = repr(float(value)) if number else escape(str(value))
+        points.append(f'<c:pt idx="{index}"><c:v>{text}</c:v></c:pt>')
+    return ''.join(points)
+
+
+def chart_xml(categories, series):
+    """Build the chart part XML for a clustered column chart.
+
+    :param categories: Category labels along the x axis.
+    :param series: Sequence of ``(name, values, hex colour, opacity)`` tuples;
+        opacity is a fraction between 0 and 1.
+    """
+    categories = list(categories)
+    category_points = _points(categories)
+    parts = []
+    for index, (name, values, fill, opacity) in enumerate(series):
+        parts.append(_SERIES_XML.format(
+            index=index,
+            name=escape(name),
+            fill=fill,
+            alpha=int(round(opacity * 100000)),
+            count=len(categories),
+            categories=category_points,
+            values=_points(values, number=True),
+        ))
+    return _CHART_XML.format(series=''.join(parts)).encode('utf-8')
+
+
+def add_bar_chart(doc, categories, series, width, height=DEFAULT_HEIGHT):
+    """Append a paragraph holding a native column chart to ``doc``.
+
+    :param doc: python-docx ``Document``.
+    :param categories: Category labels along the x axis.
+    :param series: Sequence of ``(name, values, hex colour, opacity)`` tuples.
+    :param width: Chart width (EMU or a ``docx.shared`` length).
+    :param height: Chart height (EMU or a ``docx.shared`` length).
+    :return: The paragraph containing the chart.
+    """
+    document_part = doc.part
+    partname = document_part.package.next_partname('/word/charts/chart%d.xml')
+    chart_part = Part(PackURI(partname), CHART_CONTENT_TYPE, chart_xml(categories, series),
+                      document_part.package)
+    rel_id = document_part.relate_to(chart_part, RT.CHART)
+
+    paragraph = doc.add_paragraph()
+    shape_id = document_part.next_id
+    inline = parse_xml(_INLINE_XML.format(cx=int(width), cy=int(height), shape_id=shape_id, rel_id=rel_id))
+    paragraph.add_run()._r.add_drawing(inline)
+    return paragraph
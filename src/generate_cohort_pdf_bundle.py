@@ -0,0 +1,235 @@
+import io
+import os
+import re
+import json
+from collections import defaultdict
+from pathlib import Path
+
+from pypdf import PdfReader, PdfWriter
+
+import src.generate_html_reports as generate_html_reports
+from src.browser_context_pool import get_pool
+from src.pipeline_checkpoint import STAGE_PDF_BUNDLE, retry_call
+from src.report_output_writer import get_writer, flush as flush_writes
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+JSON_DIR = BASE_DIR / 'transformed_data' / 'individual_reports'
+PDF_OUTPUT_DIR = BASE_DIR / 'output_reports_pdf'
+BUNDLE_DIR = PDF_OUTPUT_DIR / 'cohort_bundles'
+
+# Large teams are printed in several bundles so a single print job never has
+# to lay out an unbounded document.
+MAX_MEMBERS_PER_BUNDLE = 200
+
+# Invisible text stamped at the top of each member section. It survives into
+# the PDF text layer, which is how the printed bundle is split back into
+# per-member files.
+MEMBER_MARKER_PREFIX = 'BUNDLE-MEMBER:'
+MEMBER_MARKER_SUFFIX = ':END'
+MEMBER_MARKER_PATTERN = re.compile(re.escape(MEMBER_MARKER_PREFIX) + r'(\S+?)' + re.escape(MEMBER_MARKER_SUFFIX))
+
+BUNDLE_STYLE = """
+<style>
+    .bundle-member { break-before: page; }
+    .bundle-member:first-of-type { break-before: auto; }
+    .bundle-member-marker { font-size: 2px; line-height: 2px; color: #fff; }
+</style>
+<script>
+    // Charts are printed once, not watched: skip the animation so every chart
+    // is fully drawn as soon as it is created.
+    if (window.Chart) { Chart.defaults.animation = false; }
+</script>
+"""
+
+
+def _slugify(text):
+    return '_'.join(re.sub(r'[^\w\s-]', '', text).lower().split()) or 'team'
+
+
+def _split_report_html(html):
+    """Return the ``(<head> inner HTML, <body> inner HTML)`` of a rendered report."""
+    head = re.search(r'<head>(.*?)</head>', html, re.DOTALL | re.IGNORECASE)
+    body = re.search(r'<body>(.*?)</body>', html, re.DOTALL | re.IGNORECASE)
+    return (head.group(1) if head else ''), (body.group(1) if body else html)
+
+
+def _member_section(body_html, member, index):
+    """Wrap one member's report body so it can share a document with others."""
+    chart_id = f"sprintVelocityChart_{index}"
+    body_html = body_html.replace("sprintVelocityChart", chart_id)
+    # Each report declares ``const ctx`` at the top level of its inline script;
+    # wrap those scripts in a block so the declarations do not collide.
+    body_html = re.sub(r'<script>(.*?)</script>', r'<script>{\1}</script>', body_html, flags=re.DOTALL)
+    return (
+        f'<section class="bundle-member">'
+        f'<div class="bundle-member-marker">{MEMBER_MARKER_PREFIX}{member}{MEMBER_MARKER_SUFFIX}</div>'
+        f'{body_html}'
+        f'</section>'
+    )
+
+
+def build_bundle_html(member_payloads):
+    """
+    Renders each member through the report template and joins the reports into
+    one HTML document with one page-broken section per member.
+
+    :param member_payloads: List of ``(member_stem, report_data)`` tuples.
+    """
+    head_html = ''
+    sections = []
+    for index, (member, data) in enumerate(member_payloads):
+        head, body = _split_report_html(generate_html_reports.render_report_html(data))
+        head_html = head_html or head
+        sections.append(_member_section(body, member, index))
+
+    return (
+        '<!DOCTYPE html>\n<html lang="en">\n<head>'
+        f'{head_html}{BUNDLE_STYLE}</head>\n<body>\n'
+        + '\n'.join(sections)
+        + '\n</body>\n</html>'
+    )
+
+
+def print_bundle_pdf(bundle_html_path, bundle_pdf_path):
+    """
+    Prints the bundle HTML to a single PDF with Playwright.
+
+    :return: True if the PDF was written, False otherwise.
+    """
+    try:
+        with open(bundle_html_path, 'r', encoding='utf-8') as html_file:
+            html = html_file.read()
+        pdf_bytes = get_pool().render_pdf(
+            html,
+            format='A4',
+            margin={
+                'top': '10mm',
+                'right': '10mm',
+                'bottom': '10mm',
+                'left': '10mm'
+            },
+            print_background=True
+        )
+        # Written directly: the bundle is split as soon as this returns.
+        Path(bundle_pdf_path).write_bytes(pdf_bytes)
+        return True
+    except Exception as e:
+        print(f"✗ Failed to print bundle {os.path.basename(bundle_html_path)}: {e}")
+        return False
+
+
+def split_bundle_pdf(bundle_pdf_path, output_dir):
+    """
+    Splits a printed bundle into one PDF per member using the section markers.
+
+    Member PDFs are handed to the shared output writer; call ``flush_writes()``
+    before reading them back.
+
+    :return: List of member stems queued for ``output_dir``.
+    """
+    reader = PdfReader(str(bundle_pdf_path))
+    starts = []
+    for page_number, page in enumerate(reader.pages):
+        match = MEMBER_MARKER_PATTERN.search(page.extract_text() or '')
+        if match:
+            starts.append((page_number, match.group(1)))
+
+    written = []
+    for index, (first_page, member) in enumerate(starts):
+        last_page = starts[index + 1][0] if index + 1 < len(starts) else len(reader.pages)
+        writer = PdfWriter()
+        for page_number in range(first_page, last_page):
+            writer.add_page(reader.pages[page_number])
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        get_writer().write_bytes(Path(output_dir) / f"{member}.pdf", buffer.getvalue())
+        written.append(member)
+    return written
+
+
+def generate_team_bundles(member_payloads, output_dir=None):
+    """
+    Prints the given members as per-team bundles and splits them per member.
+
+    :param member_payloads: List of ``(member_stem, report_data)`` tuples.
+    :return: Set of member stems whose PDF was written.
+    """
+    output_dir = Path(output_dir or PDF_OUTPUT_DIR)
+    bundle_dir = output_dir / BUNDLE_DIR.name
+    bundle_dir.mkdir(parents=True, exist_ok=True)
+
+    teams = defaultdict(list)
+    for member, data in member_payloads:
+        teams[data.get('team', 'team')].append((member, data))
+
+    written = set()
+    for team, team_members in teams.items():
+        for chunk_start in range(0, len(team_members), MAX_MEMBERS_PER_BUNDLE):
+            chunk = team_members[chunk_start:chunk_start + MAX_MEMBERS_PER_BUNDLE]
+            bundle_name = f"{_slugify(team)}_bundle_{chunk_start // MAX_MEMBERS_PER_BUNDLE + 1}"
+            bundle_html_path = bundle_dir / f"{bundle_name}.html"
+            bundle_pdf_path = bundle_dir / f"{bundle_name}.pdf"
+
+            with open(bundle_html_path, 'w', encoding='utf-8') as html_file:
+                html_file.write(build_bundle_html(chunk))
+
+            print(f"Printing {team} bundle with {len(chunk)} member(s)...")
+            if not retry_call(print_bundle_pdf, bundle_html_path, bundle_pdf_path):
+                continue
+
+            members_written = split_bundle_pdf(bundle_pdf_path, output_dir)
+            missing = {member for member, _ in chunk} - set(members_written)
+            if missing:
+                print(f"✗ Could not locate {len(missing)} member section(s) in {bundle_pdf_path.name}: "
+                      f"{', '.join(sorted(missing))}")
+            print(f"✓ Split {bundle_pdf_path.name} into {len(members_written)} member PDF(s)")
+            written.update(members_written)
+
+    failed_writes = flush_writes()
+    for path, error in failed_writes.items():
+        print(f"✗ Failed to write {path}: {error}")
+        written.discard(path.stem)
+    return written
+
+
+def main(journal=None, members=None):
+    """
+    Prints every member report through one Playwright print job per team and
+    splits the result into per-member PDFs.
+
+    :param journal: Optional ``CheckpointJournal``; members already printed from
+        an unchanged report JSON are skipped and each outcome is recorded.
+    :param members: Optional collection of report stems to restrict printing to.
+    """
+    PDF_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    member_payloads = []
+    fingerprints = {}
+    for json_file in sorted(Path(JSON_DIR).glob('*.json')):
+        member = json_file.stem
+        if members is not None and member not in members:
+            continue
+        # Printed straight from the JSON, so the template is part of the input.
+        fingerprints[member] = generate_html_reports.report_fingerprint(json_file)
+        if journal and journal.is_done(STAGE_PDF_BUNDLE, member, fingerprints[member]) \
+                and (PDF_OUTPUT_DIR / f"{member}.pdf").exists():
+            continue
+        with open(json_file, 'r', encoding='utf-8') as handle:
+            member_payloads.append((member, json.load(handle)))
+
+    if not member_payloads:
+        print("No member reports to print.")
+        return
+
+    written = generate_team_bundles(member_payloads)
+
+    if journal:
+        for member, _ in member_payloads:
+            ok = member in written
+            journal.record(STAGE_PDF_BUNDLE, member, ok, fingerprints[member], None if ok else "Bundle print failed")
+
+    print(f"\nBundle printing complete: {len(written)}/{len(member_payloads)} member PDF(s) written to {PDF_OUTPUT_DIR}")
+
+
+if __name__ == '__main__':
+    main()
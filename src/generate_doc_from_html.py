@@ -1,10 +1,31 @@
+import hashlib
 import json
 import os
+import shutil
 from pathlib import Path
 from docx import Document
 from docx.shared import RGBColor, Inches, Cm
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-from playwright.sync_api import sync_playwright
+
+from src.docx_native_chart import add_bar_chart
+from src.pipeline_checkpoint import STAGE_DOC, retry_call, stage_fingerprint
+from src.report_output_writer import get_writer, flush as flush_writes
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+JSON_DIR = BASE_DIR / 'transformed_data' / 'individual_reports'
+HTML_DIR = BASE_DIR / 'output_reports_html'
+OUTPUT_DIR = BASE_DIR / 'output_reports_doc'
+CHART_CACHE_DIR = BASE_DIR / 'transformed_data' / 'chart_cache'
+CHART_TEMPLATE_PATH = BASE_DIR / 'templates' / 'report_template.html'
+
+# 'image' embeds a screenshot of the HTML chart; 'native' draws the chart as a
+# Word chart part from the sprint data (smaller files, no browser needed).
+CHART_FORMAT = 'image'
+
+# Colours of the HTML report's Chart.js datasets: (hex, opacity).
+COMMITTED_COLOR = ('6C63FF', 0.5)
+DELIVERED_COLOR = ('342EAD', 0.7)
 
 
 def add_header_with_style(doc, text, level=1):
@@ -123,33 +144,107 @@ def add_summary_table_with_note(doc, data_dict, note_text=None, note_url=None):
 
 def capture_chart_image(html_path, output_image_path):
     """Capture the Chart.js visualization from HTML as an image using Playwright."""
+    # Imported here so building documents from pre-captured charts never
+    # loads Playwright.
+    from src.browser_context_pool import get_pool
+
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch()
-            page = browser.new_page()
-            
-            # Load the HTML file
-            page.goto(f'file:///{html_path}')
-            
-            # Wait for Chart.js to render
-            page.wait_for_timeout(3000)
-            
-            # Locate the chart canvas and take screenshot
-            chart_element = page.query_selector('#sprintVelocityChart')
-            if chart_element:
-                chart_element.screenshot(path=str(output_image_path))
-                browser.close()
-                return True
-            
-            browser.close()
+        with open(html_path, 'r', encoding='utf-8') as html_file:
+            html = html_file.read()
+        
+        # Locate the chart canvas and take screenshot
+        png_bytes = get_pool().screenshot_element(html, '#sprintVelocityChart')
+        if png_bytes is None:
             return False
+        Path(output_image_path).write_bytes(png_bytes)
+        return True
     except Exception as e:
         print(f"Error capturing chart image: {e}")
         return False
 
 
-def generate_doc_report(json_path, output_path, html_path=None):
-    """Generate a .docx report from JSON data matching the HTML format."""
+def chart_image_path_for(json_path, output_path):
+    """Temporary chart screenshot location used while building a report."""
+    return Path(output_path).parent / f"temp_chart_{Path(json_path).stem}.png"
+
+
+def chart_cache_path(data):
+    """Cached chart screenshot for a report's sprint velocity data.
+
+    The chart drawn by the HTML template depends only on ``sprint_velocity``
+    and the template itself, so reruns for a corrected member (and members
+    with identical sprint data) reuse one screenshot instead of launching a
+    browser again.
+    """
+    digest = hashlib.sha256(Path(CHART_TEMPLATE_PATH).read_bytes())
+    digest.update(json.dumps(data.get('sprint_velocity', []), sort_keys=True).encode('utf-8'))
+    return Path(CHART_CACHE_DIR) / f"{digest.hexdigest()}.png"
+
+
+def _cache_chart_image(image_path, cached_path):
+    try:
+        cached_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(image_path, cached_path)
+    except OSError as e:
+        print(f"Could not cache chart image: {e}")
+
+
+def _add_chart_image(doc, data, json_path, output_path, html_path, chart_image_path, width):
+    """Embed the chart screenshot; returns True if an image was added."""
+    temp_image_path = None
+    image_path = None
+    cached_chart_path = chart_cache_path(data)
+    if chart_image_path and Path(chart_image_path).exists():
+        temp_image_path = Path(chart_image_path)
+    elif cached_chart_path.exists():
+        image_path = cached_chart_path
+    elif html_path and Path(html_path).exists():
+        temp_image_path = chart_image_path_for(json_path, output_path)
+        if not retry_call(capture_chart_image, html_path, temp_image_path):
+            temp_image_path = None
+    if temp_image_path:
+        _cache_chart_image(temp_image_path, cached_chart_path)
+        image_path = temp_image_path
+    
+    if image_path:
+        try:
+            doc.add_picture(str(image_path), width=width)
+            doc.add_paragraph()  # Spacing after image
+            # Clean up temporary image
+            if temp_image_path:
+                temp_image_path.unlink()
+            return True
+        except Exception as e:
+            print(f"Error adding chart image: {e}")
+    return False
+
+
+def add_native_sprint_chart(doc, data, width):
+    """Draw the sprint velocity chart as a native Word chart."""
+    sprints = data['sprint_velocity']
+    add_bar_chart(doc, [sprint['sprint'] for sprint in sprints], [
+        ('Committed Work', [sprint['committed'] for sprint in sprints], *COMMITTED_COLOR),
+        ('Delivered Work', [sprint['delivered'] for sprint in sprints], *DELIVERED_COLOR),
+    ], width)
+
+
+def doc_fingerprint(json_path, html_path=None):
+    """Checkpoint fingerprint of one DOCX: its JSON, the HTML it takes the
+    chart from (if any) and the chart format."""
+    inputs = [json_path, html_path] if html_path and Path(html_path).exists() else [json_path]
+    return stage_fingerprint(*inputs, settings={'chart_format': CHART_FORMAT})
+
+
+def generate_doc_report(json_path, output_path, html_path=None, chart_image_path=None):
+    """Generate a .docx report from JSON data matching the HTML format.
+
+    With ``CHART_FORMAT = 'native'`` the chart is drawn as a Word chart from the
+    sprint data and no image is needed. Otherwise it is embedded from
+    ``chart_image_path`` when a pre-captured image is supplied (it is deleted
+    once embedded), then from the chart cache; only otherwise is it captured
+    from ``html_path`` with Playwright. The document is saved through the shared
+    output writer; call ``report_output_writer.flush()`` before reading it back.
+    """
     
     # Load JSON data
     with open(json_path, 'r', encoding='utf-8') as f:
@@ -207,21 +302,19 @@ def generate_doc_report(json_path, output_path, html_path=None):
     # Sprint Velocity
     add_header_with_style(doc, 'Sprint Velocity', level=2)
     
-    # Try to capture and embed chart image
+    # Calculate available width (page width minus margins)
+    available_width = section.page_width - section.left_margin - section.right_margin
     chart_added = False
-    if html_path and Path(html_path).exists():
-        temp_image_path = Path(output_path).parent / f"temp_chart_{Path(json_path).stem}.png"
-        if capture_chart_image(html_path, temp_image_path):
-            try:
-                # Calculate available width (page width minus margins)
-                available_width = section.page_width - section.left_margin - section.right_margin
-                doc.add_picture(str(temp_image_path), width=available_width)
-                doc.add_paragraph()  # Spacing after image
-                chart_added = True
-                # Clean up temporary image
-                temp_image_path.unlink()
-            except Exception as e:
-                print(f"Error adding chart image: {e}")
+    if CHART_FORMAT == 'native':
+        try:
+            add_native_sprint_chart(doc, data, available_width)
+            doc.add_paragraph()  # Spacing after chart
+            chart_added = True
+        except Exception as e:
+            print(f"Error adding chart: {e}")
+    else:
+        chart_added = _add_chart_image(doc, data, json_path, output_path, html_path,
+                                       chart_image_path, available_width)
     
     if not chart_added:
         doc.add_paragraph("(Chart visualization requires HTML file)")
@@ -298,23 +391,27 @@ def generate_doc_report(json_path, output_path, html_path=None):
         doc.add_paragraph(feedback, style='List Bullet')
     
     # Save document
-    doc.save(output_path)
+    get_writer().save_docx(doc, output_path)
     print(f"Document generated successfully: {output_path}")
 
 
-def main():
-    """Main function to generate .docx reports from JSON files."""
-    # Resolve paths relative to script location
-    script_dir = Path(__file__).resolve().parent.parent
-    json_dir = script_dir / 'transformed_data' / 'individual_reports'
-    html_dir = script_dir / 'output_reports_html'
-    output_dir = script_dir / 'output_reports_doc'
+def main(journal=None, members=None):
+    """Main function to generate .docx reports from JSON files.
+
+    :param journal: Optional ``CheckpointJournal``; documents already built from
+        unchanged JSON/HTML inputs are skipped and each outcome is recorded.
+    :param members: Optional collection of report stems (e.g. ``hanan_report``)
+        to restrict generation to.
+    """
+    json_dir = Path(JSON_DIR)
+    html_dir = Path(HTML_DIR)
+    output_dir = Path(OUTPUT_DIR)
     
     # Create output directory if it doesn't exist
     output_dir.mkdir(parents=True, exist_ok=True)
     
     # Process all JSON files
-    json_files = list(json_dir.glob('*.json'))
+    json_files = [path for path in json_dir.glob('*.json') if members is None or path.stem in members]
     
     if not json_files:
         print(f"No JSON files found in {json_dir}")
@@ -322,17 +419,35 @@ def main():
     
     print(f"Found {len(json_files)} JSON file(s) to process")
     
+    generated = []
     for json_file in json_files:
+        output_file = output_dir / f"{json_file.stem}.docx"
+        html_file = html_dir / f"{json_file.stem}.html"
+        
+        # Pass HTML path if it exists
+        html_path = str(html_file) if html_file.exists() else None
+        fingerprint = doc_fingerprint(json_file, html_path)
+        
+        if journal and journal.is_done(STAGE_DOC, json_file.name, fingerprint) and output_file.exists():
+            print(f"Skipping (checkpointed): {output_file.name}")
+            continue
+        
         try:
-            output_file = output_dir / f"{json_file.stem}.docx"
-            html_file = html_dir / f"{json_file.stem}.html"
-            
-            # Pass HTML path if it exists
-            html_path = str(html_file) if html_file.exists() else None
-            
             generate_doc_report(str(json_file), str(output_file), html_path)
+            generated.append((json_file, output_file, fingerprint))
         except Exception as e:
             print(f"Error processing {json_file.name}: {e}")
+            if journal:
+                journal.record(STAGE_DOC, json_file.name, False, fingerprint, e)
+    
+    # Record outcomes only once the queued documents are actually on disk
+    failures = flush_writes()
+    for json_file, output_file, fingerprint in generated:
+        error = failures.get(output_file)
+        if error:
+            print(f"Error writing {output_file.name}: {error}")
+        if journal:
+            journal.record(STAGE_DOC, json_file.name, error is None, fingerprint, error)
 
 
 if __name__ == "__main__":
@@ -1,15 +1,52 @@
 import jinja2
 import os
 import json
+import time
 
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
+from src.pipeline_checkpoint import STAGE_HTML, stage_fingerprint
+import src.report_output_writer as report_output_writer
+from src.report_output_writer import announce, get_writer, flush as flush_writes
+
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 TEMPLATE_PARENT_DIR = BASE_DIR / 'templates'
 TRANSFORMED_JSON_DATA_DIR = BASE_DIR / 'transformed_data' / 'individual_reports'
 OUTPUT_DIR = BASE_DIR / 'output_reports_html'
 
+# Worker processes for main(); None means one per CPU. Each worker keeps its
+# own cached Jinja2 environment.
+RENDER_WORKERS = None
+# Below this many reports per worker, process start-up costs more than it saves.
+MIN_REPORTS_PER_WORKER = 25
+
+
+@lru_cache(maxsize=None)
+def _template_environment(template_dir):
+    # One environment per template directory for the life of the process; it
+    # keeps compiled templates and recompiles one only if its file changes.
+    template_loader = jinja2.FileSystemLoader(searchpath=template_dir)
+    return jinja2.Environment(loader=template_loader)
+
+
+def report_fingerprint(json_path):
+    """Checkpoint fingerprint of one HTML report: its JSON and the templates."""
+    return stage_fingerprint(json_path, templates=sorted(Path(TEMPLATE_PARENT_DIR).glob('*.html')))
+
+
+def render_report_html(data, template_name='report_template.html'):
+    """
+    Renders the report template with the data and returns the HTML string.
+
+    :param data: A dictionary containing the data for the report.
+    :param template_name: The name of the Jinja2 template file.
+    """
+    template = _template_environment(str(TEMPLATE_PARENT_DIR)).get_template(template_name)
+    return template.render(data)
+
 
 def generate_evaluation_report(data, template_name='report_template.html', output_filename='evaluation_report.html'):
     """
@@ -18,98 +55,206 @@ def generate_evaluation_report(data, template_name='report_template.html', outpu
     :param data: A dictionary containing the data for the report.
     :param template_name: The name of the Jinja2 template file.
     :param output_filename: The name of the output HTML file.
+    :return: True if the report was rendered and queued for writing, False otherwise.
+        The file is written by the shared output writer; call
+        ``report_output_writer.flush()`` before reading it back.
     """
     try:
-        # Set up Jinja2 environment
-        template_loader = jinja2.FileSystemLoader(searchpath=TEMPLATE_PARENT_DIR)
-        template_env = jinja2.Environment(loader=template_loader)
-        template = template_env.get_template(template_name)
-
         # Render the template with the data
-        output_html = template.render(data)
+        output_html = render_report_html(data, template_name)
 
-        # Write the output to a file
-        with open(os.path.join(OUTPUT_DIR, output_filename), 'w') as f:
-            f.write(output_html)
+        # Queue the output file; it is written in the background
+        get_writer().write_text(os.path.join(OUTPUT_DIR, output_filename), output_html)
 
         print(f"Successfully generated report: {os.path.abspath(os.path.join(OUTPUT_DIR, output_filename))}")
+        return True
 
     except jinja2.TemplateNotFound:
         print(f"Error: Template '{template_name}' not found.")
     except Exception as e:
         print(f"An error occurred: {e}")
+    return False
+
+
+def _render_one(transformed_file):
+    """
+    Renders one report JSON to HTML and queues it for writing.
+
+    :return: Tuple of (transformed_file, output_filename, error or None, seconds).
+    """
+    started = time.perf_counter()
+    output_filename = transformed_file.replace('.json', '.html')
+    error = None
+    try:
+        with open(os.path.join(TRANSFORMED_JSON_DATA_DIR, transformed_file), 'r', encoding='utf-8') as json_file:
+            json_file_dict = json.load(json_file)
+
+            """Example of json_file_dict
+
+            report_data = {
+                'employee_name': 'Yousif',
+                'team': 'AIOps (Team Code Orbit)',
+                'evaluation_period': 'Overall',
+                'generation_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                
+                'attendance_summary': {
+                    'total_days': 81,
+                    'present_days': 80,
+                    'absent_days': 1
+                },
+                'attendance_details': [
+                    {'date': '2025-07-22', 'status': 'Absent (1st Half) Arrived late'},
+                    {'date': '2025-07-24', 'status': 'Absent (2nd Half) Left early'}
+                ],
+                
+                'sprint_velocity': [
+                    {'sprint': 'Sprint 1 & 2 [Overview & Datastructures]', 'committed': 100, 'delivered': ((30/50) * 100), 'plagiarism': 'Yes'},
+                    {'sprint': 'Sprint 3 & 4 [Computer Networks & APIs]', 'committed': 100, 'delivered': ((20/50) * 100), 'plagiarism': 'Yes'},
+                    {'sprint': 'Sprint 5 & 6 [Databases & REST API]', 'committed': 100, 'delivered': ((15/50) * 100), 'plagiarism': 'No'},
+                    {'sprint': 'Sprint 7 & 8 [Data Analysis & Machine Learning]', 'committed': 100, 'delivered': ((33.3/50) * 100), 'plagiarism': 'Yes'},
+                ],
+                
+                'monthly_evaluation': {
+                    'Overall Performance': 'Below Average',
+                    'Monthly Progress': [
+                        {'month': 'April', 'percentage': 16, 'notes': 'Most of the coding related solutions were left empty.'},
+                        {'month': 'May', 'percentage': 49.3, 'notes': 'Only a warning for copy/pasting was issued. JPlag detected plagiarism in submissions.'},
+                        {'month': 'June', 'percentage': 0, 'notes': "Didn't submit"},
+                        {'month': 'July', 'percentage': 0, 'notes': 'Submitted but failed the viva and unable to explain anything.'}
+                    ],
+                    'Key Strengths': [
+                        'He can speak for his team.',
+                        'He clearly states if he feels something is wrong.',
+                    ],
+                    'Areas for Improvement': [
+                        'Avoid copying others, try to understand the task and complete it independently.',
+                        'Reduce the dependency on others for task completion.',
+                        'Utilize the time effectively to complete the tasks.',
+                        'Focus on the sessions and try to come up with questions.',
+                        'Focus on self upskilling rather than thinking about other matters.',
+                        'Improve the selection of words to communicate without causing misunderstandings.'
+                    ]
+                },
+                
+                'trainers_feedback': [
+                    'He is not able to focus during the sessions thus unable to answer any question that is asked.',
+                    'His mind is usually occupied with other thoughts preventing him from engaging at all.',
+                    'He seems to have no interest in programming, although he has the potential to do well if he develops interest like he did participate well in the "Databases" sessions.',
+                    'He has to be extremely consistent in practice, so he can start understanding the basics and start catching up.'
+                ]
+            }
+            """
+
+        # Generate the report
+        if not generate_evaluation_report(json_file_dict, output_filename=output_filename):
+            error = "HTML rendering failed"
+    except Exception as e:
+        print(f"Failed to generate report for {transformed_file}: {e}")
+        error = e
+    return transformed_file, output_filename, error, time.perf_counter() - started
+
+
+def _init_render_worker(json_dir, output_dir, template_dir, fsync_writes):
+    # Spawned workers re-import this module and the writer with their defaults.
+    global TRANSFORMED_JSON_DATA_DIR, OUTPUT_DIR, TEMPLATE_PARENT_DIR
+    TRANSFORMED_JSON_DATA_DIR, OUTPUT_DIR, TEMPLATE_PARENT_DIR = json_dir, output_dir, template_dir
+    report_output_writer.FSYNC_WRITES = fsync_writes
 
 
-def main():
+def _render_chunk(transformed_files):
+    """Worker task: render a slice of the members and wait for their files to land."""
+    results = [_render_one(transformed_file) for transformed_file in transformed_files]
+    failures = flush_writes()
+    chunk_results = []
+    for transformed_file, output_filename, error, seconds in results:
+        error = error or failures.get(Path(OUTPUT_DIR) / output_filename)
+        # Errors go back as text; not every exception survives pickling.
+        chunk_results.append((transformed_file, output_filename, str(error) if error else None, seconds))
+    return chunk_results
+
+
+def _render_in_pool(transformed_files, workers):
+    # Members are partitioned into a few chunks per worker so slow reports
+    # balance out without paying a round trip per member.
+    chunk_count = min(len(transformed_files), workers * 4)
+    chunks = [transformed_files[index::chunk_count] for index in range(chunk_count)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                             initargs=(TRANSFORMED_JSON_DATA_DIR, OUTPUT_DIR, TEMPLATE_PARENT_DIR,
+                                       report_output_writer.FSYNC_WRITES)) as pool:
+        for chunk_results in pool.map(_render_chunk, chunks):
+            results.extend(chunk_results)
+    for _, output_filename, error, _ in results:
+        if error is None:
+            # Written by a worker's output writer; tell this process's listeners
+            announce(Path(OUTPUT_DIR) / output_filename)
+    return results
+
+
+def main(journal=None, members=None, workers=None):
     """
     Generates evaluation reports for all JSON files in the transformed data directory.
+
+    :param journal: Optional ``CheckpointJournal``; reports already rendered from
+        an unchanged JSON are skipped and each outcome is recorded.
+    :param members: Optional collection of report stems to restrict rendering to.
+    :param workers: Worker processes to render with; defaults to ``RENDER_WORKERS``
+        (None means one per CPU). Small batches are rendered in this process.
+    :return: Dict with the number of reports rendered and failed, the wall-clock
+        seconds and the summed per-report render seconds.
     """
-    for transformed_file in os.listdir(TRANSFORMED_JSON_DATA_DIR):
+    started = time.perf_counter()
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    pending = []
+    fingerprints = {}
+    for transformed_file in sorted(os.listdir(TRANSFORMED_JSON_DATA_DIR)):
+        if members is not None and os.path.splitext(transformed_file)[0] not in members:
+            continue
         if transformed_file.endswith('.json'):
-            try:
-                with open(os.path.join(TRANSFORMED_JSON_DATA_DIR, transformed_file), 'r', encoding='utf-8') as json_file:
-                    json_file_dict = json.load(json_file)
-
-                    """Example of json_file_dict
-
-                    report_data = {
-                        'employee_name': 'Yousif',
-                        'team': 'AIOps (Team Code Orbit)',
-                        'evaluation_period': 'Overall',
-                        'generation_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        
-                        'attendance_summary': {
-                            'total_days': 81,
-                            'present_days': 80,
-                            'absent_days': 1
-                        },
-                        'attendance_details': [
-                            {'date': '2025-07-22', 'status': 'Absent (1st Half) Arrived late'},
-                            {'date': '2025-07-24', 'status': 'Absent (2nd Half) Left early'}
-                        ],
-                        
-                        'sprint_velocity': [
-                            {'sprint': 'Sprint 1 & 2 [Overview & Datastructures]', 'committed': 100, 'delivered': ((30/50) * 100), 'plagiarism': 'Yes'},
-                            {'sprint': 'Sprint 3 & 4 [Computer Networks & APIs]', 'committed': 100, 'delivered': ((20/50) * 100), 'plagiarism': 'Yes'},
-                            {'sprint': 'Sprint 5 & 6 [Databases & REST API]', 'committed': 100, 'delivered': ((15/50) * 100), 'plagiarism': 'No'},
-                            {'sprint': 'Sprint 7 & 8 [Data Analysis & Machine Learning]', 'committed': 100, 'delivered': ((33.3/50) * 100), 'plagiarism': 'Yes'},
-                        ],
-                        
-                        'monthly_evaluation': {
-                            'Overall Performance': 'Below Average',
-                            'Monthly Progress': [
-                                {'month': 'April', 'percentage': 16, 'notes': 'Most of the coding related solutions were left empty.'},
-                                {'month': 'May', 'percentage': 49.3, 'notes': 'Only a warning for copy/pasting was issued. JPlag detected plagiarism in submissions.'},
-                                {'month': 'June', 'percentage': 0, 'notes': "Didn't submit"},
-                                {'month': 'July', 'percentage': 0, 'notes': 'Submitted but failed the viva and unable to explain anything.'}
-                            ],
-                            'Key Strengths': [
-                                'He can speak for his team.',
-                                'He clearly states if he feels something is wrong.',
-                            ],
-                            'Areas for Improvement': [
-                                'Avoid copying others, try to understand the task and complete it independently.',
-                                'Reduce the dependency on others for task completion.',
-                                'Utilize the time effectively to complete the tasks.',
-                                'Focus on the sessions and try to come up with questions.',
-                                'Focus on self upskilling rather than thinking about other matters.',
-                                'Improve the selection of words to communicate without causing misunderstandings.'
-                            ]
-                        },
-                        
-                        'trainers_feedback': [
-                            'He is not able to focus during the sessions thus unable to answer any question that is asked.',
-                            'His mind is usually occupied with other thoughts preventing him from engaging at all.',
-                            'He seems to have no interest in programming, although he has the potential to do well if he develops interest like he did participate well in the "Databases" sessions.',
-                            'He has to be extremely consistent in practice, so he can start understanding the basics and start catching up.'
-                        ]
-                    }
-                    """
-
-                    # Generate the report
-                    generate_evaluation_report(json_file_dict, output_filename=transformed_file.replace('.json', '.html'))
-            except Exception as e:
-                print(f"Failed to generate report for {transformed_file}: {e}")
+            output_filename = transformed_file.replace('.json', '.html')
+            fingerprint = report_fingerprint(os.path.join(TRANSFORMED_JSON_DATA_DIR, transformed_file))
+            if journal and journal.is_done(STAGE_HTML, transformed_file, fingerprint) \
+                    and os.path.exists(os.path.join(OUTPUT_DIR, output_filename)):
+                print(f"Skipping (checkpointed): {output_filename}")
+                continue
+            pending.append(transformed_file)
+            fingerprints[transformed_file] = fingerprint
+
+    workers = workers or RENDER_WORKERS or os.cpu_count() or 1
+    workers = min(workers, max(1, len(pending) // MIN_REPORTS_PER_WORKER))
+    if workers > 1:
+        print(f"Rendering {len(pending)} report(s) with {workers} worker processes")
+        results = _render_in_pool(pending, workers)
+    else:
+        results = [_render_one(transformed_file) for transformed_file in pending]
+        # Record outcomes only once the queued reports are actually on disk
+        failures = flush_writes()
+        results = [
+            (transformed_file, output_filename,
+             error or failures.get(Path(OUTPUT_DIR) / output_filename), seconds)
+            for transformed_file, output_filename, error, seconds in results
+        ]
+
+    failed = 0
+    render_seconds = 0.0
+    for transformed_file, output_filename, error, seconds in results:
+        render_seconds += seconds
+        if error:
+            failed += 1
+            print(f"Failed to generate {output_filename}: {error}")
+        if journal:
+            journal.record(STAGE_HTML, transformed_file, error is None, fingerprints[transformed_file], error)
+
+    timings = {
+        'rendered': len(results) - failed,
+        'failed': failed,
+        'wall_seconds': time.perf_counter() - started,
+        'render_seconds': render_seconds,
+    }
+    if results:
+        print(f"Rendered {timings['rendered']} HTML report(s), {failed} failed, in {timings['wall_seconds']:.2f}s "
+              f"({render_seconds / len(results) * 1000:.1f} ms per report across {workers} process(es))")
+    return timings
 
 
 if __name__ == '__main__':
@@ -2,6 +2,14 @@ import os
 from pathlib import Path
 from docx2pdf import convert
 
+from src.pipeline_checkpoint import STAGE_PDF_FROM_DOC, file_fingerprint, retry_call
+from src.report_output_writer import announce
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DOC_DIR = BASE_DIR / 'output_reports_doc'
+PDF_DIR = BASE_DIR / 'output_reports_pdf'
+
 
 def convert_doc_to_pdf(doc_path, pdf_path):
     """Convert a .docx file to PDF using docx2pdf."""
@@ -14,18 +22,21 @@ def convert_doc_to_pdf(doc_path, pdf_path):
         return False
 
 
-def main():
-    """Main function to convert all .docx reports to PDF."""
-    # Resolve paths relative to script location
-    script_dir = Path(__file__).resolve().parent.parent
-    doc_dir = script_dir / 'output_reports_doc'
-    pdf_dir = script_dir / 'output_reports_pdf'
+def main(journal=None, members=None):
+    """Main function to convert all .docx reports to PDF.
+
+    :param journal: Optional ``CheckpointJournal``; documents already converted
+        from an unchanged .docx are skipped and each outcome is recorded.
+    :param members: Optional collection of report stems to restrict conversion to.
+    """
+    doc_dir = Path(DOC_DIR)
+    pdf_dir = Path(PDF_DIR)
     
     # Create output directory if it doesn't exist
     pdf_dir.mkdir(parents=True, exist_ok=True)
     
     # Find all .docx files
-    doc_files = list(doc_dir.glob('*.docx'))
+    doc_files = [path for path in doc_dir.glob('*.docx') if members is None or path.stem in members]
     
     if not doc_files:
         print(f"No .docx files found in {doc_dir}")
@@ -36,16 +47,26 @@ def main():
     
     success_count = 0
     fail_count = 0
+    skip_count = 0
     
     for doc_file in doc_files:
         pdf_file = pdf_dir / f"{doc_file.stem}.pdf"
-        if convert_doc_to_pdf(doc_file, pdf_file):
+        fingerprint = file_fingerprint(doc_file)
+        if journal and journal.is_done(STAGE_PDF_FROM_DOC, doc_file.name, fingerprint) and pdf_file.exists():
+            skip_count += 1
+            continue
+        ok = retry_call(convert_doc_to_pdf, doc_file, pdf_file)
+        if journal:
+            journal.record(STAGE_PDF_FROM_DOC, doc_file.name, ok, fingerprint, None if ok else "docx2pdf conversion failed")
+        if ok:
+            # docx2pdf writes the file itself; let output listeners know it is done
+            announce(pdf_file)
             success_count += 1
         else:
             fail_count += 1
     
     print("-" * 60)
-    print(f"Conversion complete: {success_count} successful, {fail_count} failed")
+    print(f"Conversion complete: {success_count} successful, {fail_count} failed, {skip_count} skipped (checkpointed)")
 
 
 if __name__ == "__main__":
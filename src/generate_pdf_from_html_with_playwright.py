@@ -1,6 +1,9 @@
 import os
 from pathlib import Path
-from playwright.sync_api import sync_playwright
+
+from src.browser_context_pool import get_pool
+from src.pipeline_checkpoint import STAGE_PDF_FROM_HTML, file_fingerprint, retry_call
+from src.report_output_writer import get_writer, flush as flush_writes
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 HTML_REPORTS_DIR = BASE_DIR / 'output_reports_html'
@@ -13,42 +16,42 @@ def generate_pdf_from_html_playwright(html_file_path, pdf_output_path):
     
     :param html_file_path: Full path to the input HTML file.
     :param pdf_output_path: Full path for the output PDF file.
+    :return: True if the PDF was printed and queued for writing, False otherwise.
     """
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch()
-            page = browser.new_page()
-            
-            # Load HTML file
-            page.goto(f'file:///{html_file_path.replace(os.sep, "/")}')
-            
-            # Wait for Chart.js to render
-            page.wait_for_timeout(3000)  # 3 seconds for chart rendering
-            
-            # Generate PDF
-            page.pdf(
-                path=pdf_output_path,
-                format='A4',
-                margin={
-                    'top': '10mm',
-                    'right': '10mm',
-                    'bottom': '10mm',
-                    'left': '10mm'
-                },
-                print_background=True
-            )
-            
-            browser.close()
+        with open(html_file_path, 'r', encoding='utf-8') as html_file:
+            html = html_file.read()
+        
+        # Print on a pre-warmed browser context; the shared output writer puts
+        # the PDF on disk
+        pdf_bytes = get_pool().render_pdf(
+            html,
+            format='A4',
+            margin={
+                'top': '10mm',
+                'right': '10mm',
+                'bottom': '10mm',
+                'left': '10mm'
+            },
+            print_background=True
+        )
         
+        get_writer().write_bytes(pdf_output_path, pdf_bytes)
         print(f"✓ Successfully generated PDF: {os.path.basename(pdf_output_path)}")
+        return True
         
     except Exception as e:
         print(f"✗ Failed to generate PDF for {os.path.basename(html_file_path)}: {e}")
+        return False
 
 
-def main():
+def main(journal=None, members=None):
     """
     Converts all HTML reports to PDF using Playwright.
+
+    :param journal: Optional ``CheckpointJournal``; reports already printed from
+        an unchanged HTML file are skipped and each outcome is recorded.
+    :param members: Optional collection of report stems to restrict conversion to.
     """
     # Create output directory if it doesn't exist
     if not os.path.exists(PDF_OUTPUT_DIR):
@@ -56,7 +59,8 @@ def main():
         print(f"Created directory: {PDF_OUTPUT_DIR}\n")
     
     # Get all HTML files
-    html_files = [f for f in os.listdir(HTML_REPORTS_DIR) if f.endswith('.html')]
+    html_files = [f for f in os.listdir(HTML_REPORTS_DIR)
+                  if f.endswith('.html') and (members is None or f[:-len('.html')] in members)]
     
     if not html_files:
         print("No HTML files found in output_reports_html directory.")
@@ -65,12 +69,28 @@ def main():
     print(f"Found {len(html_files)} HTML report(s). Starting conversion with Playwright...\n")
     
     # Convert each HTML file to PDF
+    printed = []
     for html_filename in html_files:
         html_path = os.path.join(HTML_REPORTS_DIR, html_filename)
         pdf_filename = html_filename.replace('.html', '.pdf')
         pdf_path = os.path.join(PDF_OUTPUT_DIR, pdf_filename)
+        fingerprint = file_fingerprint(html_path)
         
-        generate_pdf_from_html_playwright(html_path, pdf_path)
+        if journal and journal.is_done(STAGE_PDF_FROM_HTML, html_filename, fingerprint) and os.path.exists(pdf_path):
+            print(f"Skipping (checkpointed): {pdf_filename}")
+            continue
+        
+        printed.append((html_filename, pdf_path, fingerprint, retry_call(generate_pdf_from_html_playwright, html_path, pdf_path)))
+    
+    # PDFs are written in the background; record outcomes once they are on disk
+    failed_writes = flush_writes()
+    for html_filename, pdf_path, fingerprint, ok in printed:
+        error = failed_writes.get(Path(pdf_path))
+        if error:
+            print(f"✗ Failed to write {pdf_path}: {error}")
+        if journal:
+            journal.record(STAGE_PDF_FROM_HTML, html_filename, ok and not error, fingerprint,
+                           None if ok and not error else str(error or "Playwright PDF failed"))
     
     print(f"\nConversion complete! PDFs saved to: {PDF_OUTPUT_DIR}")
 
@@ -0,0 +1,225 @@
+"""Per-team ZIP archives of the finished DOCX and PDF reports.
+
+``ReportArchivePackager`` is fed each report as soon as it is on disk (through
+``report_output_writer.add_commit_listener()``, or a direct ``add()`` call from
+the pipelined scheduler), so archives are built while the pipeline is still
+rendering instead of in a second pass over the output directories once it is
+done. Reading and checksumming files runs on a thread pool; each team archive
+is appended to under its own lock, so different teams are packaged in parallel.
+
+PDF and DOCX files are already deflate-compressed internally, so they are
+stored as-is: compressing them again costs CPU for next to no size gain. Every
+archive carries a ``manifest.json`` with the SHA-256 of each file, and a
+``<archive>.zip.sha256`` file (``sha256sum`` format) is written next to it.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+from src.pipeline_checkpoint import STAGE_PACKAGE
+from src.report_output_writer import add_commit_listener, remove_commit_listener
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+JSON_DIR = BASE_DIR / 'transformed_data' / 'individual_reports'
+DOC_DIR = BASE_DIR / 'output_reports_doc'
+PDF_DIR = BASE_DIR / 'output_reports_pdf'
+ARCHIVE_DIR = BASE_DIR / 'output_archives'
+
+DEFAULT_ARCHIVE_WORKERS = 4
+MANIFEST_NAME = 'manifest.json'
+UNKNOWN_TEAM = 'Unassigned'
+
+# Formats that are compressed containers already; everything else is deflated.
+STORED_SUFFIXES = {'.pdf', '.docx', '.png', '.zip'}
+
+
+def _slugify(text):
+    return '_'.join(re.sub(r'[^\w\s-]', '', text).lower().split()) or 'team'
+
+
+def _archived_folders():
+    # Read at call time so config overrides of DOC_DIR / PDF_DIR apply.
+    return ((Path(DOC_DIR), 'doc', '.docx'), (Path(PDF_DIR), 'pdf', '.pdf'))
+
+
+class _TeamArchive:
+    """One team's ZIP file, written to a temporary name until ``close()``."""
+
+    def __init__(self, team, archive_dir):
+        self.team = team
+        self.path = Path(archive_dir) / f"{_slugify(team)}_reports.zip"
+        self._temp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        self._zip = zipfile.ZipFile(self._temp_path, 'w')
+        self._lock = threading.Lock()
+        self.entries = []
+
+    def add(self, arcname, data, digest, mtime):
+        compress_type = zipfile.ZIP_STORED if Path(arcname).suffix in STORED_SUFFIXES else zipfile.ZIP_DEFLATED
+        info = zipfile.ZipInfo(arcname, date_time=time.localtime(mtime)[:6])
+        info.compress_type = compress_type
+        with self._lock:
+            self._zip.writestr(info, data)
+            self.entries.append({'path': arcname, 'size': len(data), 'sha256': digest})
+
+    def close(self):
+        """Add the manifest, move the archive into place and write its checksum file."""
+        manifest = {
+            'team': self.team,
+            'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'files': sorted(self.entries, key=lambda entry: entry['path']),
+        }
+        with self._lock:
+            self._zip.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2, ensure_ascii=False),
+                               compress_type=zipfile.ZIP_DEFLATED)
+            self._zip.close()
+        os.replace(self._temp_path, self.path)
+
+        digest = hashlib.sha256()
+        with open(self.path, 'rb') as archive_file:
+            for chunk in iter(lambda: archive_file.read(1024 * 1024), b''):
+                digest.update(chunk)
+        with open(f"{self.path}.sha256", 'w', encoding='utf-8') as checksum_file:
+            checksum_file.write(f"{digest.hexdigest()}  {self.path.name}\n")
+        return self.path
+
+    def discard(self):
+        with self._lock:
+            self._zip.close()
+        if self._temp_path.exists():
+            self._temp_path.unlink()
+
+
+class ReportArchivePackager:
+    """Streams finished DOCX/PDF reports into one ZIP archive per team."""
+
+    def __init__(self, archive_dir=None, workers=None):
+        self.archive_dir = Path(archive_dir or ARCHIVE_DIR)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self._pool = ThreadPoolExecutor(max_workers=workers or DEFAULT_ARCHIVE_WORKERS,
+                                        thread_name_prefix='archive')
+        self._lock = threading.Lock()
+        self._archives = {}
+        self._teams = {}
+        self._seen = set()
+        self._pending = []
+        self._streaming = False
+        # Only the creating process may package: a forked worker that still
+        # sees this packager would build a private archive nobody closes.
+        self._owner_pid = os.getpid()
+
+    def start_streaming(self):
+        """Package every report the shared output writer commits from now on."""
+        add_commit_listener(self.add)
+        self._streaming = True
+
+    def add(self, path):
+        """Queue a finished report for packaging; other files are ignored.
+
+        :return: Future of the packaging job, or None if the file is not archived.
+        """
+        if os.getpid() != self._owner_pid:
+            return None
+        path = Path(path)
+        arcname = self._arcname(path)
+        if arcname is None:
+            return None
+        with self._lock:
+            if path in self._seen:
+                return None
+            self._seen.add(path)
+            future = self._pool.submit(self._package, path, arcname)
+            self._pending.append(future)
+        return future
+
+    def finish(self, journal=None, fill_missing=True):
+        """Wait for queued files, close every archive and return their paths.
+
+        :param journal: Optional ``CheckpointJournal``; the outcome of each
+            team archive is recorded.
+        :param fill_missing: Also package reports already on disk that were not
+            produced during this run (members skipped as checkpointed, or a
+            standalone packaging run), so each archive covers the whole team.
+        """
+        if self._streaming:
+            remove_commit_listener(self.add)
+            self._streaming = False
+        if fill_missing:
+            for directory, _, suffix in _archived_folders():
+                for path in sorted(directory.glob(f'*{suffix}')):
+                    self.add(path)
+
+        wait(self._pending)
+        self._pool.shutdown(wait=True)
+        failures = [future.exception() for future in self._pending if future.exception()]
+        for error in failures:
+            print(f"✗ Could not package report: {error}")
+
+        written = {}
+        for team, archive in self._archives.items():
+            try:
+                written[team] = archive.close()
+                print(f"✓ Packaged {len(archive.entries)} file(s) for {team} → {written[team].name}")
+                ok, error = True, None
+            except Exception as e:
+                archive.discard()
+                print(f"✗ Failed to write archive for {team}: {e}")
+                ok, error = False, e
+            if journal:
+                journal.record(STAGE_PACKAGE, archive.path.name, ok and not failures, None,
+                               error or (f"{len(failures)} file(s) could not be packaged" if failures else None))
+        return written
+
+    def _arcname(self, path):
+        for directory, folder, suffix in _archived_folders():
+            if path.suffix == suffix and path.parent == directory and not path.name.startswith('.'):
+                return f"{folder}/{path.name}"
+        return None
+
+    def _team_for(self, member):
+        # Each member's report JSON records its team; read it once per member.
+        if member not in self._teams:
+            team = UNKNOWN_TEAM
+            json_path = Path(JSON_DIR) / f"{member}.json"
+            if json_path.exists():
+                with open(json_path, 'r', encoding='utf-8') as json_file:
+                    team = json.load(json_file).get('team') or UNKNOWN_TEAM
+            self._teams[member] = team
+        return self._teams[member]
+
+    def _archive_for(self, team):
+        with self._lock:
+            if team not in self._archives:
+                self._archives[team] = _TeamArchive(team, self.archive_dir)
+            return self._archives[team]
+
+    def _package(self, path, arcname):
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        self._archive_for(self._team_for(path.stem)).add(arcname, data, digest, path.stat().st_mtime)
+
+
+def main(journal=None, members=None):
+    """
+    Packages every DOCX and PDF report on disk into per-team ZIP archives.
+
+    Archives always cover the whole team, so ``members`` does not narrow them;
+    it is accepted for the same call signature as the other stages.
+    """
+    packager = ReportArchivePackager()
+    archives = packager.finish(journal)
+    if not archives:
+        print(f"No reports found to package in {DOC_DIR} or {PDF_DIR}")
+        return
+    print(f"\nPackaging complete! Archives saved to: {packager.archive_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+"""Run-over-run performance regression guard for the report pipeline.
+
+Runs the pipeline stage by stage on a fixed fixture, measures each stage's wall time and output size, and compares
+them with a stored baseline. Any stage slower or larger than the baseline by
+more than the allowed threshold is reported and the run exits non-zero, so the
+guard can sit in CI or be run by hand after a template or dependency upgrade.
+
+The fixture is a snapshot of the workbooks in ``input_data/`` taken when the
+baseline is saved and kept next to it in ``config/perf_fixture/``. Later checks
+run on that snapshot, so new or edited workbooks in ``input_data/`` do not
+change what is measured.
+
+Every measured run happens in a throwaway copy of the code, templates and
+schema, so checkpoints and caches of the working tree are neither used nor
+touched and each stage starts cold. The default stages need no network,
+browser or Word: the DOC reports use the native chart format and no PDFs are
+printed.
+"""
+
+import argparse
+import hashlib
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from importlib import metadata
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+FIXTURE_SOURCE_DIR = BASE_DIR / 'input_data'
+FIXTURE_DIR = BASE_DIR / 'config' / 'perf_fixture'
+BASELINE_PATH = BASE_DIR / 'config' / 'perf_baseline.json'
+
+# Copied into every throwaway workspace; everything else is produced by the run.
+WORKSPACE_ITEMS = ('main_app.py', 'src', 'templates', 'schema')
+FIXTURE_SUFFIXES = ('.xlsx',)
+
+DEFAULT_STAGES = ('excel', 'reports', 'validate', 'html', 'doc', 'package')
+DEFAULT_REPEATS = 3
+# Allowed growth over the baseline before a stage counts as regressed.
+TIME_THRESHOLD = 0.20
+SIZE_THRESHOLD = 0.10
+# Time differences below this are treated as noise, however large in percent.
+MIN_TIME_DELTA_SECONDS = 0.25
+
+# Output directory of each stage, relative to the workspace.
+STAGE_OUTPUTS = {
+    'excel': 'transformed_data/sharepoint_excel_to_json_data',
+    'reports': 'transformed_data/individual_reports',
+    'validate': None,
+    'html': 'output_reports_html',
+    'doc': 'output_reports_doc',
+    'pdf': 'output_reports_pdf',
+    'package': 'output_archives',
+}
+
+TRACKED_PACKAGES = ('Jinja2', 'openpyxl', 'python-docx', 'playwright', 'pypdf')
+
+
+def fixture_digest(fixture_dir):
+    """SHA-256 over the fixture workbooks, so a baseline is only compared with the same input."""
+    digest = hashlib.sha256()
+    for path in _fixture_workbooks(fixture_dir):
+        digest.update(path.name.encode('utf-8'))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _fixture_workbooks(directory):
+    return [path for path in sorted(Path(directory).iterdir()) if path.suffix in FIXTURE_SUFFIXES]
+
+
+def snapshot_fixture(source_dir, fixture_dir):
+    """Replace the workbooks in ``fixture_dir`` with copies of those in ``source_dir``."""
+    workbooks = _fixture_workbooks(source_dir)
+    if not workbooks:
+        raise FileNotFoundError(f"No workbooks found in {source_dir}")
+    fixture_dir = Path(fixture_dir)
+    fixture_dir.mkdir(parents=True, exist_ok=True)
+    for path in _fixture_workbooks(fixture_dir):
+        path.unlink()
+    for path in workbooks:
+        shutil.copy2(path, fixture_dir / path.name)
+    return len(workbooks)
+
+
+def _environment():
+    versions = {}
+    for package in TRACKED_PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'packages': versions,
+    }
+
+
+def _output_size(workspace, stage):
+    relative = STAGE_OUTPUTS.get(stage)
+    if relative is None:
+        return 0
+    directory = Path(workspace) / relative
+    if not directory.exists():
+        return 0
+    return sum(path.stat().st_size for path in directory.rglob('*') if path.is_file())
+
+
+def _prepare_workspace(fixture_dir):
+    # No config file is copied: without one main_app.py uses DEFAULT_CONFIG,
+    # so the working tree's settings cannot change what is measured.
+    workspace = Path(tempfile.mkdtemp(prefix='perf_guard_'))
+    for name in WORKSPACE_ITEMS:
+        source = BASE_DIR / name
+        if source.is_dir():
+            shutil.copytree(source, workspace / name, ignore=shutil.ignore_patterns('__pycache__'))
+        else:
+            shutil.copy2(source, workspace / name)
+    input_dir = workspace / 'input_data'
+    input_dir.mkdir()
+    for path in _fixture_workbooks(fixture_dir):
+        shutil.copy2(path, input_dir / path.name)
+    return workspace
+
+
+def run_once(stages, fixture_dir, pipeline_args=()):
+    """Run each stage in a fresh workspace and return ``{stage: {seconds, bytes}}``."""
+    workspace = _prepare_workspace(fixture_dir)
+    results = {}
+    try:
+        for stage in stages:
+            command = [sys.executable, 'main_app.py', '--stages', stage, '--chart-format', 'native',
+                       *pipeline_args]
+            started = time.perf_counter()
+            completed = subprocess.run(command, cwd=workspace, capture_output=True, text=True)
+            elapsed = time.perf_counter() - started
+            if completed.returncode != 0:
+                raise RuntimeError(f"Stage '{stage}' failed (exit {completed.returncode}):\n"
+                                   f"{completed.stdout[-2000:]}{completed.stderr[-2000:]}")
+            results[stage] = {'seconds': elapsed, 'bytes': _output_size(workspace, stage)}
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+    return results
+
+
+def measure(stages=DEFAULT_STAGES, repeats=DEFAULT_REPEATS, fixture_dir=None, pipeline_args=()):
+    """Median stage timings and output sizes over ``repeats`` runs."""
+    fixture_dir = Path(fixture_dir or FIXTURE_DIR)
+    runs = []
+    for attempt in range(repeats):
+        print(f"Run {attempt + 1}/{repeats}...")
+        runs.append(run_once(stages, fixture_dir, pipeline_args))
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'fixture_sha256': fixture_digest(fixture_dir),
+        'repeats': repeats,
+        'pipeline_args': list(pipeline_args),
+        'environment': _environment(),
+        'stages': {
+            stage: {
+                'seconds': round(statistics.median(run[stage]['seconds'] for run in runs), 4),
+                'bytes': max(run[stage]['bytes'] for run in runs),
+            }
+            for stage in stages
+        },
+    }
+
+
+def compare(baseline, current, time_threshold=TIME_THRESHOLD, size_threshold=SIZE_THRESHOLD):
+    """Return a list of regression messages (empty if everything is within limits)."""
+    regressions = []
+    for stage, measured in current['stages'].items():
+        expected = baseline['stages'].get(stage)
+        if expected is None:
+            continue
+        extra_seconds = measured['seconds'] - expected['seconds']
+        if extra_seconds > MIN_TIME_DELTA_SECONDS and measured['seconds'] > expected['seconds'] * (1 + time_threshold):
+            regressions.append(f"{stage}: {expected['seconds']:.2f}s → {measured['seconds']:.2f}s "
+                               f"(+{extra_seconds / expected['seconds']:.0%}, limit +{time_threshold:.0%})")
+        if measured['bytes'] > expected['bytes'] * (1 + size_threshold):
+            growth = (measured['bytes'] - expected['bytes']) / expected['bytes'] if expected['bytes'] else float('inf')
+            regressions.append(f"{stage}: output {expected['bytes']:,} → {measured['bytes']:,} bytes "
+                               f"(+{growth:.0%}, limit +{size_threshold:.0%})")
+    return regressions
+
+
+def _print_report(baseline, current):
+    print(f"\n{'Stage':<10}{'Baseline':>12}{'Current':>12}{'Change':>9}{'Baseline size':>16}{'Current size':>16}")
+    print("-" * 75)
+    for stage, measured in current['stages'].items():
+        expected = (baseline or {}).get('stages', {}).get(stage)
+        if expected:
+            change = (measured['seconds'] - expected['seconds']) / expected['seconds'] if expected['seconds'] else 0.0
+            print(f"{stage:<10}{expected['seconds']:>11.2f}s{measured['seconds']:>11.2f}s{change:>+9.0%}"
+                  f"{expected['bytes']:>16,}{measured['bytes']:>16,}")
+        else:
+            print(f"{stage:<10}{'-':>12}{measured['seconds']:>11.2f}s{'':>9}{'-':>16}{measured['bytes']:>16,}")
+
+    if baseline:
+        changed = {package: (version, current['environment']['packages'].get(package))
+                   for package, version in baseline['environment']['packages'].items()
+                   if current['environment']['packages'].get(package) != version}
+        for package, (old, new) in changed.items():
+            print(f"Note: {package} changed since the baseline: {old} → {new}")
+        if baseline['environment']['python'] != current['environment']['python']:
+            print(f"Note: Python changed since the baseline: "
+                  f"{baseline['environment']['python']} → {current['environment']['python']}")
+
+
+def main(argv=None):
+    """
+    Measures the pipeline and checks it against the stored baseline.
+
+    :return: Process exit code: 0 if within limits (or a baseline was saved),
+        1 on a regression, 2 if there is no comparable baseline.
+    """
+    parser = argparse.ArgumentParser(description="Check pipeline stage timings and output sizes against a baseline")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Store this run as the new baseline instead of comparing")
+    parser.add_argument('--baseline', default=str(BASELINE_PATH), help="Baseline JSON file")
+    parser.add_argument('--fixture', default=str(FIXTURE_DIR),
+                        help="Directory with the fixture workbooks the baseline is measured on")
+    parser.add_argument('--fixture-source', default=str(FIXTURE_SOURCE_DIR),
+                        help="Workbooks copied into --fixture by --save-baseline")
+    parser.add_argument('--stages', nargs='+', default=list(DEFAULT_STAGES), choices=list(STAGE_OUTPUTS),
+                        help="Stages to measure, in pipeline order")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS,
+                        help="Runs per measurement; the median time is compared")
+    parser.add_argument('--time-threshold', type=float, default=TIME_THRESHOLD,
+                        help="Allowed slowdown per stage as a fraction, e.g. 0.2 for +20%%")
+    parser.add_argument('--size-threshold', type=float, default=SIZE_THRESHOLD,
+                        help="Allowed output size growth per stage as a fraction")
+    args, pipeline_args = parser.parse_known_args(argv)
+
+    baseline_path = Path(args.baseline)
+    baseline = None
+    if baseline_path.exists():
+        with open(baseline_path, 'r', encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+
+    if args.save_baseline:
+        count = snapshot_fixture(args.fixture_source, args.fixture)
+        print(f"✓ Copied {count} workbook(s) from {args.fixture_source} to {args.fixture}")
+    elif not Path(args.fixture).is_dir() or not _fixture_workbooks(args.fixture):
+        print(f"✗ No fixture workbooks in {args.fixture}; create them with --save-baseline")
+        return 2
+
+    # Extra options (e.g. --pdf-backend playwright) are passed to main_app.py.
+    if baseline and not args.save_baseline:
+        pipeline_args = pipeline_args or baseline.get('pipeline_args', [])
+    current = measure(args.stages, max(1, args.repeats), args.fixture, pipeline_args)
+
+    if args.save_baseline:
+        _print_report(None, current)
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as baseline_file:
+            json.dump(current, baseline_file, indent=2)
+        print(f"\n✓ Baseline saved to {baseline_path}")
+        return 0
+
+    if baseline is None:
+        _print_report(None, current)
+        print(f"\n✗ No baseline at {baseline_path}; create one with --save-baseline")
+        return 2
+    if baseline['fixture_sha256'] != current['fixture_sha256']:
+        _print_report(None, current)
+        print("\n✗ The fixture workbooks differ from the ones the baseline was taken with; "
+              "save a new baseline with --save-baseline")
+        return 2
+
+    _print_report(baseline, current)
+    regressions = compare(baseline, current, args.time_threshold, args.size_threshold)
+    if regressions:
+        print(f"\n✗ {len(regressions)} regression(s) against the baseline from {baseline['created_at']}:")
+        for regression in regressions:
+            print(f"  ✗ {regression}")
+        return 1
+    print(f"\n✓ No regressions against the baseline from {baseline['created_at']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""Checkpoint journal and retry helpers for resumable pipeline runs.
+
+The journal is an append-only JSON-lines file with one record per
+(stage, item) outcome. When ``main_app.py`` is rerun, each stage asks the
+journal whether an item already succeeded for the same input fingerprint and
+skips it, so only incomplete or failed items are processed again. Appending a
+line per outcome keeps the cost of checkpointing constant per item and means a
+crash can lose at most the record being written.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+CHECKPOINT_PATH = BASE_DIR / 'transformed_data' / 'pipeline_checkpoint.jsonl'
+
+# Stage keys used in the journal.
+STAGE_EXCEL_TO_JSON = 'excel_to_json'
+STAGE_EVAL_REPORT_JSON = 'eval_report_json'
+STAGE_HTML = 'html'
+STAGE_DOC = 'doc'
+STAGE_PDF_FROM_DOC = 'pdf_from_doc'
+STAGE_PDF_FROM_HTML = 'pdf_from_html'
+STAGE_PDF_BUNDLE = 'pdf_bundle'
+STAGE_PACKAGE = 'package'
+
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+# Retry policy for flaky steps (browser launches, docx2pdf/Word automation).
+# ``configure_retries()`` lets the entry point override these at startup.
+RETRY_POLICY = {
+    'retries': 2,
+    'backoff_seconds': 2.0,
+}
+
+
+def configure_retries(retries=None, backoff_seconds=None):
+    """Override the default retry count and initial backoff delay."""
+    if retries is not None:
+        RETRY_POLICY['retries'] = max(0, int(retries))
+    if backoff_seconds is not None:
+        RETRY_POLICY['backoff_seconds'] = max(0.0, float(backoff_seconds))
+
+
+def retry_call(func, *args, retries=None, backoff_seconds=None, **kwargs):
+    """Call ``func`` and retry it with exponential backoff on failure.
+
+    A call fails if it raises or returns ``False`` (the convention used by the
+    conversion helpers in this package). The last exception is re-raised, and
+    a final ``False`` is returned as-is, once the retries are exhausted.
+    """
+    retries = RETRY_POLICY['retries'] if retries is None else retries
+    backoff_seconds = RETRY_POLICY['backoff_seconds'] if backoff_seconds is None else backoff_seconds
+
+    for attempt in range(retries + 1):
+        is_last_attempt = attempt == retries
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if is_last_attempt:
+                raise
+            print(f"  ↻ {getattr(func, '__name__', 'call')} failed ({e}); retrying ({attempt + 1}/{retries})")
+        else:
+            if result is not False or is_last_attempt:
+                return result
+            print(f"  ↻ {getattr(func, '__name__', 'call')} failed; retrying ({attempt + 1}/{retries})")
+        time.sleep(backoff_seconds * (2 ** attempt))
+
+
+def file_fingerprint(*paths):
+    """Cheap fingerprint of input files: size and modification time of each."""
+    parts = []
+    for path in paths:
+        stat = os.stat(path)
+        parts.append(f"{stat.st_size}:{stat.st_mtime_ns}")
+    return '|'.join(parts)
+
+
+# Content digests of templates, keyed by (path, size, mtime) so each template
+# is hashed once per process however many members use it.
+_content_digests = {}
+
+
+def content_digest(path):
+    """Short SHA-256 of a file's content."""
+    stat = os.stat(path)
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _content_digests:
+        _content_digests[key] = hashlib.sha256(Path(path).read_bytes()).hexdigest()[:16]
+    return _content_digests[key]
+
+
+def stage_fingerprint(*paths, templates=(), settings=None):
+    """Fingerprint of one stage item: what it is built from, not just its input.
+
+    :param paths: Input files of the item (size and mtime, as ``file_fingerprint``).
+    :param templates: Files the output is rendered with; their content is hashed,
+        so editing a template invalidates every report rendered from it.
+    :param settings: JSON-serializable config values that change the output
+        (team name, months, chart format...).
+    """
+    parts = [file_fingerprint(*paths)]
+    parts.extend(f"template:{content_digest(template)}" for template in templates)
+    if settings:
+        encoded = json.dumps(settings, sort_keys=True, default=str).encode('utf-8')
+        parts.append(f"settings:{hashlib.sha256(encoded).hexdigest()[:16]}")
+    return '|'.join(parts)
+
+
+class CheckpointJournal:
+    """Per-stage, per-item status journal backed by a JSON-lines file."""
+
+    def __init__(self, path=CHECKPOINT_PATH):
+        self.path = Path(path)
+        self._entries = {}
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        line_count = 0
+        with self.path.open('r', encoding='utf-8') as handle:
+            for line in handle:
+                line_count += 1
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-write; ignore it.
+                    continue
+                self._entries[(record['stage'], record['item'])] = record
+
+        # Rewrite the journal with only the latest record per item once stale
+        # records dominate, so repeated resumes do not grow it without bound.
+        if line_count > 2 * len(self._entries) + 100:
+            temp_path = self.path.with_suffix('.tmp')
+            with temp_path.open('w', encoding='utf-8') as handle:
+                for record in self._entries.values():
+                    handle.write(json.dumps(record, ensure_ascii=False) + '\n')
+            os.replace(temp_path, self.path)
+
+    def reset(self):
+        """Forget every checkpoint so the next run starts from scratch."""
+        self._entries = {}
+        if self.path.exists():
+            self.path.unlink()
+
+    def is_done(self, stage, item, fingerprint=None):
+        """True if ``item`` succeeded in ``stage`` for the same input fingerprint."""
+        record = self._entries.get((stage, item))
+        if not record or record['status'] != STATUS_DONE:
+            return False
+        return fingerprint is None or record.get('fingerprint') == fingerprint
+
+    def record(self, stage, item, ok, fingerprint=None, error=None):
+        """Append the outcome of ``item`` in ``stage`` to the journal."""
+        previous = self._entries.get((stage, item), {})
+        record = {
+            'stage': stage,
+            'item': item,
+            'status': STATUS_DONE if ok else STATUS_FAILED,
+            'attempts': previous.get('attempts', 0) + 1,
+            'fingerprint': fingerprint,
+            'error': None if ok else str(error) if error else None,
+            'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        self._entries[(stage, item)] = record
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open('a', encoding='utf-8') as handle:
+            handle.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def failed_items(self, stage=None):
+        """List ``(stage, item, error)`` for items whose latest outcome failed."""
+        return [
+            (record['stage'], record['item'], record['error'])
+            for record in self._entries.values()
+            if record['status'] == STATUS_FAILED and (stage is None or record['stage'] == stage)
+        ]
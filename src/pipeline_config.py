@@ -0,0 +1,255 @@
+"""Pipeline configuration shared by ``main_app.py`` and the stage modules.
+
+Settings that used to be hardcoded (team name, source JSON, target months,
+input/output directories, which stages run) live in
+``config/pipeline_config.json``. ``load_config()`` reads that file on top of the
+built-in defaults, ``main_app.py`` layers its command line options over the
+result, and ``apply_config()`` pushes the paths and months into the module
+constants the stages already read (``OUTPUT_DIR``, ``TARGET_MONTHS``, ...), so
+each stage keeps working unchanged when run on its own.
+"""
+
+import copy
+import importlib
+import json
+import sys
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_CONFIG_PATH = BASE_DIR / 'config' / 'pipeline_config.json'
+
+# Stage names in execution order:
+# excel   - Excel workbooks → aggregate team JSON (stage 1)
+# reports - aggregate JSON → individual report JSONs (stage 2)
+# validate - individual report JSONs checked against schema/report_schema.json
+# html    - individual JSONs → HTML reports (stage 3)
+# doc     - JSON + HTML chart → DOCX reports (stage 4)
+# pdf     - DOCX → PDF with docx2pdf, or HTML → PDF with Playwright (stage 5)
+# package - DOCX/PDF reports → per-team ZIP archives (stage 6)
+STAGES = ('excel', 'reports', 'validate', 'html', 'doc', 'pdf', 'package')
+OUTPUT_FORMATS = ('html', 'docx', 'pdf')
+# playwright_bundle prints each team as one document and splits it per member.
+PDF_BACKENDS = ('docx2pdf', 'playwright', 'playwright_bundle')
+# image: screenshot of the HTML chart; native: Word chart drawn from the data.
+CHART_FORMATS = ('image', 'native')
+
+DEFAULT_CONFIG = {
+    'team_name': 'Team Code Orbit (AIOps)',
+    'source_json': 'transformed_data/sharepoint_excel_to_json_data/team_code_orbit_data.json',
+    'target_months': [
+        'April 2025', 'May 2025', 'June 2025', 'July 2025',
+        'August 2025', 'September 2025', 'October 2025',
+    ],
+    'final_eval_months': ['September 2025', 'October 2025'],
+    'directories': {
+        'input': 'input_data',
+        'aggregate_json': 'transformed_data/sharepoint_excel_to_json_data',
+        'individual_reports': 'transformed_data/individual_reports',
+        'html': 'output_reports_html',
+        'doc': 'output_reports_doc',
+        'pdf': 'output_reports_pdf',
+        'archives': 'output_archives',
+    },
+    'stages': ['validate', 'html', 'doc', 'pdf'],
+    'output_formats': ['html', 'docx', 'pdf'],
+    'pdf_backend': 'docx2pdf',
+    'chart_format': 'image',
+    'pipelined': False,
+    'workers': {
+        'cpu_workers': None,
+        'browser_slots': 2,
+        'converter_slots': 1,
+        'archive_workers': 4,
+        'html_workers': None,
+    },
+    'retries': 2,
+    'retry_backoff_seconds': 2.0,
+    'members': None,
+    'fsync_writes': True,
+    'stream_reports': False,
+}
+
+# Keys whose values are dicts merged key-by-key rather than replaced.
+_NESTED_KEYS = ('directories', 'workers')
+
+# Config most recently passed to apply_config(); applied again to stage
+# modules imported afterwards through import_stage().
+_active_config = None
+
+
+def merge_config(base, overrides):
+    """Return ``base`` updated with every non-None value from ``overrides``."""
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if value is None:
+            continue
+        if key in _NESTED_KEYS and isinstance(value, dict):
+            merged[key].update({k: v for k, v in value.items() if v is not None})
+        else:
+            merged[key] = value
+    return merged
+
+
+def validate_config(config):
+    """Raise ``ValueError`` for stage, format or backend names the pipeline does not know."""
+    unknown_stages = set(config['stages']) - set(STAGES)
+    if unknown_stages:
+        raise ValueError(f"Unknown stage(s) {sorted(unknown_stages)}; expected any of {list(STAGES)}")
+    unknown_formats = set(config['output_formats']) - set(OUTPUT_FORMATS)
+    if unknown_formats:
+        raise ValueError(f"Unknown output format(s) {sorted(unknown_formats)}; expected any of {list(OUTPUT_FORMATS)}")
+    if config['pdf_backend'] not in PDF_BACKENDS:
+        raise ValueError(f"Unknown PDF backend '{config['pdf_backend']}'; expected one of {list(PDF_BACKENDS)}")
+    if config['chart_format'] not in CHART_FORMATS:
+        raise ValueError(f"Unknown chart format '{config['chart_format']}'; expected one of {list(CHART_FORMATS)}")
+
+
+def load_config(path=None):
+    """Load the JSON config file (if present) on top of ``DEFAULT_CONFIG``."""
+    path = Path(path) if path else DEFAULT_CONFIG_PATH
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    if path.exists():
+        with path.open('r', encoding='utf-8') as handle:
+            config = merge_config(config, json.load(handle))
+    elif path != DEFAULT_CONFIG_PATH:
+        raise FileNotFoundError(f"Config file not found at {path}")
+    validate_config(config)
+    return config
+
+
+def resolve_path(value):
+    """Resolve a config path; relative paths are taken from the repository root."""
+    path = Path(value)
+    return path if path.is_absolute() else BASE_DIR / path
+
+
+def member_stems(names):
+    """Map member names or report stems to the ``<slug>_report`` file stems.
+
+    ``"Hanan Aljabri"``, ``"hanan_aljabri"`` and ``"hanan_aljabri_report"`` all
+    select ``hanan_aljabri_report``. Returns None (no filter) for an empty input.
+    """
+    if not names:
+        return None
+    stems = set()
+    for name in names:
+        slug = '_'.join(name.lower().split())
+        stems.add(slug if slug.endswith('_report') else f"{slug}_report")
+    return stems
+
+
+def select_stages(config):
+    """Return the configured stages, in order, that the requested formats need."""
+    formats = set(config['output_formats'])
+    needed = {'excel', 'reports', 'validate'}
+    if formats:
+        needed.add('html')
+    if 'docx' in formats or ('pdf' in formats and config['pdf_backend'] == 'docx2pdf'):
+        needed.add('doc')
+    if 'pdf' in formats:
+        needed.add('pdf')
+    if formats & {'docx', 'pdf'}:
+        needed.add('package')
+    return [stage for stage in STAGES if stage in config['stages'] and stage in needed]
+
+
+def _module_overrides(config):
+    directories = {key: resolve_path(value) for key, value in config['directories'].items()}
+    return {
+        'src.transform_sp_excel_performance_to_json': {
+            'INPUT_DIR': str(directories['input']),
+            'OUTPUT_DIR': str(directories['aggregate_json']),
+        },
+        'src.transform_sp_json_to_eval_report_json': {
+            'SOURCE_JSON': resolve_path(config['source_json']),
+            'OUTPUT_DIR': directories['individual_reports'],
+            'TEAM_NAME': config['team_name'],
+            'TARGET_MONTHS': tuple(config['target_months']),
+            'FINAL_EVAL_MONTHS': tuple(config['final_eval_months']),
+            'STREAM_SOURCE': bool(config['stream_reports']),
+        },
+        'src.validate_report_json': {
+            'JSON_DIR': directories['individual_reports'],
+        },
+        'src.generate_html_reports': {
+            'TRANSFORMED_JSON_DATA_DIR': directories['individual_reports'],
+            'OUTPUT_DIR': directories['html'],
+            'RENDER_WORKERS': config['workers']['html_workers'],
+        },
+        'src.generate_doc_from_html': {
+            'JSON_DIR': directories['individual_reports'],
+            'HTML_DIR': directories['html'],
+            'OUTPUT_DIR': directories['doc'],
+            'CHART_FORMAT': config['chart_format'],
+        },
+        'src.generate_pdf_from_doc': {
+            'DOC_DIR': directories['doc'],
+            'PDF_DIR': directories['pdf'],
+        },
+        'src.generate_pdf_from_html_with_playwright': {
+            'HTML_REPORTS_DIR': directories['html'],
+            'PDF_OUTPUT_DIR': directories['pdf'],
+        },
+        'src.generate_cohort_pdf_bundle': {
+            'JSON_DIR': directories['individual_reports'],
+            'PDF_OUTPUT_DIR': directories['pdf'],
+        },
+        'src.package_report_archives': {
+            'JSON_DIR': directories['individual_reports'],
+            'DOC_DIR': directories['doc'],
+            'PDF_DIR': directories['pdf'],
+            'ARCHIVE_DIR': directories['archives'],
+            'DEFAULT_ARCHIVE_WORKERS': config['workers']['archive_workers'],
+        },
+        'src.pipeline_scheduler': {
+            'JSON_DIR': directories['individual_reports'],
+            'HTML_DIR': directories['html'],
+            'DOC_DIR': directories['doc'],
+            'PDF_DIR': directories['pdf'],
+        },
+        'src.report_output_writer': {
+            'FSYNC_WRITES': bool(config['fsync_writes']),
+        },
+        'src.regenerate_members': {
+            'JSON_DIR': directories['individual_reports'],
+            'HTML_DIR': directories['html'],
+            'DOC_DIR': directories['doc'],
+            'PDF_DIR': directories['pdf'],
+        },
+        'src.render_work_queue': {
+            'JSON_DIR': directories['individual_reports'],
+            'HTML_DIR': directories['html'],
+            'DOC_DIR': directories['doc'],
+            'PDF_DIR': directories['pdf'],
+        },
+    }
+
+
+def apply_config(config):
+    """Point the constants of every already-imported stage module at ``config``.
+
+    Stage modules imported later through ``import_stage()`` pick the same
+    configuration up on import.
+    """
+    global _active_config
+    _active_config = config
+    for module_name, constants in _module_overrides(config).items():
+        module = sys.modules.get(module_name)
+        if module is None:
+            continue
+        for name, value in constants.items():
+            setattr(module, name, value)
+
+
+def import_stage(module_name):
+    """Import a stage module on first use and apply the active config to it.
+
+    Stage modules pull in heavy dependencies (Playwright, python-docx,
+    docx2pdf, openpyxl), so callers import them only when a stage actually runs.
+    """
+    module = importlib.import_module(module_name)
+    if _active_config is not None:
+        for name, value in _module_overrides(_active_config).get(module_name, {}).items():
+            setattr(module, name, value)
+    return module
@@ -0,0 +1,350 @@
+"""Long-running pipeline daemon and its thin client, over a Unix socket.
+
+Every ``python main_app.py`` run pays interpreter start-up, the imports of
+openpyxl, python-docx, Jinja2 and Playwright, template and schema compilation
+and a Chromium launch before the first report is touched. During review week
+that is paid dozens of times a day. The daemon pays it once:
+
+    python -m src.pipeline_daemon serve                      # keep running
+    python -m src.pipeline_daemon run -- --stages html doc   # main_app.py options
+    python -m src.pipeline_daemon status
+    python -m src.pipeline_daemon stop
+
+``serve`` imports every stage module, compiles the report template and the
+report schema, and starts the browser pool once. Jobs then call
+``main_app.main()`` in the daemon process, one at a time on a single job thread,
+so the Playwright pool (bound to the thread that started it) stays warm across
+jobs. Everything a job prints is streamed back to the client as it happens,
+and the client exits with the job's exit code. The client imports only the
+standard library, so it starts in a few milliseconds.
+
+Worker processes (HTML rendering pool, ``--pipelined`` scheduler) are started
+through a fork server that has the stage modules preloaded. Their output goes
+to the daemon's own console, not to the client.
+
+Code and schema changes are not reloaded: a job submitted after a source file
+changed is refused with a message to restart the daemon. Template changes are
+picked up because Jinja2 recompiles a template whose file changed.
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SOCKET_PATH = BASE_DIR / 'transformed_data' / 'pipeline_daemon.sock'
+
+# Source files the running daemon has loaded; a change means it is stale.
+WATCHED_PATTERNS = ('main_app.py', 'src/*.py', 'schema/*.json')
+
+# Imported (and configured) when the daemon starts.
+WARM_MODULES = (
+    'src.transform_sp_excel_performance_to_json',
+    'src.transform_sp_json_to_eval_report_json',
+    'src.validate_report_json',
+    'src.generate_html_reports',
+    'src.generate_doc_from_html',
+    'src.generate_pdf_from_html_with_playwright',
+    'src.generate_cohort_pdf_bundle',
+    'src.package_report_archives',
+    'src.pipeline_scheduler',
+    'src.regenerate_members',
+)
+
+ACCEPT_TIMEOUT_SECONDS = 0.5
+
+
+def _send(connection, message):
+    connection.sendall((json.dumps(message) + '\n').encode('utf-8'))
+
+
+def _messages(connection):
+    """Yield the JSON-line messages received on ``connection``."""
+    with connection.makefile('r', encoding='utf-8') as stream:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _source_stamp():
+    stamp = {}
+    for pattern in WATCHED_PATTERNS:
+        for path in BASE_DIR.glob(pattern):
+            stamp[str(path)] = path.stat().st_mtime_ns
+    return stamp
+
+
+class _OutputRouter:
+    """``sys.stdout`` / ``sys.stderr`` stand-in that sends job output to the client.
+
+    Writes from any thread of the daemon (the output writer, archive workers)
+    go to the current job's client while a job runs, and to the daemon's own
+    console otherwise.
+    """
+
+    def __init__(self, console):
+        self.console = console
+        self.sink = None
+
+    def write(self, text):
+        sink = self.sink
+        if sink is None:
+            return self.console.write(text)
+        sink(text)
+        return len(text)
+
+    def flush(self):
+        if self.sink is None:
+            self.console.flush()
+
+    def isatty(self):
+        return False
+
+    @property
+    def encoding(self):
+        return 'utf-8'
+
+
+class PipelineDaemon:
+    """Keeps the pipeline imported and warm, and runs submitted jobs in order."""
+
+    def __init__(self, socket_path=None):
+        self.socket_path = Path(socket_path or SOCKET_PATH)
+        self.started_at = time.time()
+        self.jobs_run = 0
+        self.current_job = None
+        self._job_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._stamp = _source_stamp()
+        self._stdout = _OutputRouter(sys.stdout)
+        self._stderr = _OutputRouter(sys.stderr)
+        self._sink_lock = threading.Lock()
+
+    def warm_up(self):
+        """Import every stage, compile the template and schema, start the browser."""
+        import multiprocessing
+
+        if str(BASE_DIR) not in sys.path:
+            sys.path.insert(0, str(BASE_DIR))
+        # Forking a threaded process is unsafe; a fork server with the stages
+        # preloaded still starts worker processes without re-importing them.
+        multiprocessing.set_start_method('forkserver', force=True)
+        multiprocessing.set_forkserver_preload(list(WARM_MODULES))
+
+        started = time.perf_counter()
+        import main_app
+        import src.pipeline_config as pipeline_config
+
+        pipeline_config.apply_config(pipeline_config.load_config())
+        modules = {name: pipeline_config.import_stage(name) for name in WARM_MODULES}
+        generate_html_reports = modules['src.generate_html_reports']
+        generate_html_reports._template_environment(
+            str(generate_html_reports.TEMPLATE_PARENT_DIR)).get_template('report_template.html')
+        validate_report_json = modules['src.validate_report_json']
+        validate_report_json.load_validator(str(validate_report_json.SCHEMA_PATH))
+        self._main = main_app.main
+        print(f"✓ Pipeline modules, template and schema loaded in {time.perf_counter() - started:.2f}s")
+
+        try:
+            from src.browser_context_pool import get_pool
+            started = time.perf_counter()
+            get_pool()
+            print(f"✓ Browser pool started in {time.perf_counter() - started:.2f}s")
+        except Exception as e:
+            # Only the browser stages need it; they report the error if used.
+            print(f"✗ Browser pool not started ({e.__class__.__name__}); browser stages will start it on use")
+
+    def _run_job(self, argv, cwd, sink):
+        """Run ``main_app.main(argv)`` with output routed to ``sink``; returns the exit code."""
+        if _source_stamp() != self._stamp:
+            sink("✗ Pipeline code or schema changed since the daemon started; restart it with "
+                 "'python -m src.pipeline_daemon stop' and 'serve' to pick the changes up.\n")
+            return 1
+
+        self.current_job = {'argv': argv, 'started_at': time.time()}
+        previous_cwd = os.getcwd()
+        self._stdout.sink = self._stderr.sink = sink
+        try:
+            os.chdir(cwd or previous_cwd)
+            code = self._main(argv)
+        except SystemExit as e:
+            if isinstance(e.code, str):
+                print(e.code)
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception:
+            traceback.print_exc()
+            code = 1
+        finally:
+            self._stdout.sink = self._stderr.sink = None
+            os.chdir(previous_cwd)
+            self.current_job = None
+            self.jobs_run += 1
+        return code or 0
+
+    def _status(self):
+        return {
+            'pid': os.getpid(),
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'jobs_run': self.jobs_run,
+            'current_job': self.current_job,
+            'stale': _source_stamp() != self._stamp,
+        }
+
+    def _handle(self, connection):
+        with connection:
+            try:
+                request = next(_messages(connection), None)
+                if request is None:
+                    return
+                command = request.get('command')
+                if command == 'status':
+                    _send(connection, {'status': self._status()})
+                elif command == 'stop':
+                    self._stop.set()
+                    _send(connection, {'output': "Daemon stopping after the current job.\n", 'exit': 0})
+                elif command == 'run':
+                    self._handle_run(connection, request)
+                else:
+                    _send(connection, {'output': f"Unknown command {command!r}\n", 'exit': 2})
+            except (BrokenPipeError, ConnectionResetError):
+                # The client went away; a job it started still runs to the end.
+                pass
+
+    def _handle_run(self, connection, request):
+        client_gone = threading.Event()
+
+        def sink(text):
+            if client_gone.is_set():
+                return
+            try:
+                with self._sink_lock:
+                    _send(connection, {'output': text})
+            except OSError:
+                client_gone.set()
+
+        if self._job_lock.locked():
+            sink("Waiting for the running job to finish...\n")
+        with self._job_lock:
+            code = self._job_runner.submit(self._run_job, list(request.get('argv', [])),
+                                           request.get('cwd'), sink).result()
+        if not client_gone.is_set():
+            _send(connection, {'exit': code})
+
+    def serve(self):
+        """Warm up, then accept jobs until ``stop`` (or SIGTERM / Ctrl+C)."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        if self.socket_path.exists():
+            if _connect(self.socket_path) is not None:
+                raise SystemExit(f"A daemon is already listening on {self.socket_path}")
+            self.socket_path.unlink()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # One job thread for the life of the daemon: Playwright's sync API is
+        # bound to the thread that started it, so the browser pool lives here.
+        self._job_runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pipeline-job')
+        self._job_runner.submit(self.warm_up).result()
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(str(self.socket_path))
+        os.chmod(self.socket_path, 0o600)
+        server.listen()
+        server.settimeout(ACCEPT_TIMEOUT_SECONDS)
+        signal.signal(signal.SIGTERM, lambda *_: self._stop.set())
+        sys.stdout, sys.stderr = self._stdout, self._stderr
+        print(f"✓ Pipeline daemon (pid {os.getpid()}) listening on {self.socket_path}")
+
+        handlers = []
+        try:
+            while not self._stop.is_set():
+                try:
+                    connection, _ = server.accept()
+                except socket.timeout:
+                    continue
+                connection.settimeout(None)
+                handler = threading.Thread(target=self._handle, args=(connection,), daemon=True)
+                handler.start()
+                handlers = [thread for thread in handlers if thread.is_alive()] + [handler]
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+            for handler in handlers:
+                handler.join()
+            self._job_runner.shutdown(wait=True)
+            sys.stdout, sys.stderr = self._stdout.console, self._stderr.console
+            print(f"Daemon stopped after {self.jobs_run} job(s)")
+
+
+def _connect(socket_path):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(str(socket_path))
+    except (FileNotFoundError, ConnectionRefusedError):
+        client.close()
+        return None
+    return client
+
+
+def request(command, argv=None, socket_path=None):
+    """Send one command to the daemon, print what it streams back.
+
+    :return: Exit code of the job (or of the command), 3 if no daemon is running.
+    """
+    socket_path = Path(socket_path or SOCKET_PATH)
+    client = _connect(socket_path)
+    if client is None:
+        print(f"No pipeline daemon is listening on {socket_path}; "
+              f"start one with 'python -m src.pipeline_daemon serve'", file=sys.stderr)
+        return 3
+    with client:
+        _send(client, {'command': command, 'argv': argv or [], 'cwd': os.getcwd()})
+        code = 1
+        for message in _messages(client):
+            if 'output' in message:
+                sys.stdout.write(message['output'])
+                sys.stdout.flush()
+            if 'status' in message:
+                print(json.dumps(message['status'], indent=2))
+                code = 0
+            if 'exit' in message:
+                code = message['exit']
+        return code
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run pipeline jobs in a long-running warm process",
+        epilog="For 'run', main_app.py options follow '--', e.g. run -- --stages html doc")
+    parser.add_argument('command', choices=['serve', 'run', 'status', 'stop'])
+    parser.add_argument('--socket', default=str(SOCKET_PATH), help="Unix socket of the daemon")
+
+    # Daemon options may come before or after the command; everything after
+    # '--' belongs to main_app.py and is passed through untouched.
+    argv = list(sys.argv[1:] if argv is None else argv)
+    pipeline_args = []
+    if '--' in argv:
+        split = argv.index('--')
+        argv, pipeline_args = argv[:split], argv[split + 1:]
+    args, extra = parser.parse_known_args(argv)
+    pipeline_args = extra + pipeline_args
+    if pipeline_args and args.command != 'run':
+        parser.error(f"'{args.command}' takes no pipeline options")
+
+    if args.command == 'serve':
+        PipelineDaemon(args.socket).serve()
+        return 0
+    return request(args.command, pipeline_args, args.socket)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,268 @@
+"""Pipelined, dependency-aware scheduler for the per-member rendering stages.
+
+``main_app.py`` runs stages as barriers: no DOCX starts until every HTML report
+is done. This scheduler instead lets each member flow through its own chain of
+stages, so member A can be converting to PDF while member B is still rendering
+HTML. Every stage has its own worker pool sized for its bottleneck:
+
+- ``html`` and ``doc``: CPU-bound Jinja2 / python-docx work, one process per core
+- ``chart`` (and ``pdf`` with the Playwright backend): Chromium instances
+- ``pdf`` with the docx2pdf backend: Word/converter instances
+
+Pools are process-based so CPU stages are not serialized by the GIL and the
+browser/converter automation always runs on a worker's main thread. With the
+stages overlapping, end-to-end time approaches that of the slowest stage rather
+than the sum of all stages.
+"""
+
+import os
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+import src.pipeline_checkpoint as pipeline_checkpoint
+import src.pipeline_config as pipeline_config
+import src.report_output_writer as report_output_writer
+from src.pipeline_config import import_stage
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+JSON_DIR = BASE_DIR / 'transformed_data' / 'individual_reports'
+HTML_DIR = BASE_DIR / 'output_reports_html'
+DOC_DIR = BASE_DIR / 'output_reports_doc'
+PDF_DIR = BASE_DIR / 'output_reports_pdf'
+
+PDF_BACKEND_DOCX2PDF = 'docx2pdf'
+PDF_BACKEND_PLAYWRIGHT = 'playwright'
+
+DEFAULT_BROWSER_SLOTS = 2
+DEFAULT_CONVERTER_SLOTS = 1
+
+
+def _paths(member):
+    return {
+        'json': JSON_DIR / f"{member}.json",
+        'html': HTML_DIR / f"{member}.html",
+        'chart': DOC_DIR / f"temp_chart_{member}.png",
+        'doc': DOC_DIR / f"{member}.docx",
+        'pdf': PDF_DIR / f"{member}.pdf",
+    }
+
+
+# Stage tasks run inside the pool processes, so they must be module-level
+# functions taking only picklable arguments. Each returns a success flag and
+# imports its stage module on first use, so a pool process only loads the
+# dependencies of the stages it actually runs. Tasks that write through the
+# shared output writer flush it before returning, so the next stage (possibly
+# in another process) finds the file complete.
+
+def _flushed(ok):
+    return bool(ok) and not report_output_writer.flush()
+
+
+def _render_html(member, retry_policy):
+    generate_html_reports = import_stage('src.generate_html_reports')
+    paths = _paths(member)
+    with open(paths['json'], 'r', encoding='utf-8') as json_file:
+        data = json.load(json_file)
+    return _flushed(generate_html_reports.generate_evaluation_report(data, output_filename=paths['html'].name))
+
+
+def _capture_chart(member, retry_policy):
+    # A missing chart is not fatal: the DOC stage falls back to a placeholder,
+    # exactly as generate_doc_report() does when it captures the chart itself.
+    generate_doc_from_html = import_stage('src.generate_doc_from_html')
+    paths = _paths(member)
+    with open(paths['json'], 'r', encoding='utf-8') as json_file:
+        if generate_doc_from_html.chart_cache_path(json.load(json_file)).exists():
+            return True
+    pipeline_checkpoint.configure_retries(**retry_policy)
+    pipeline_checkpoint.retry_call(generate_doc_from_html.capture_chart_image, str(paths['html']), paths['chart'])
+    return True
+
+
+def _build_doc(member, retry_policy):
+    generate_doc_from_html = import_stage('src.generate_doc_from_html')
+    paths = _paths(member)
+    generate_doc_from_html.generate_doc_report(str(paths['json']), str(paths['doc']), chart_image_path=paths['chart'])
+    return _flushed(True)
+
+
+def _convert_doc_to_pdf(member, retry_policy):
+    generate_pdf_from_doc = import_stage('src.generate_pdf_from_doc')
+    paths = _paths(member)
+    pipeline_checkpoint.configure_retries(**retry_policy)
+    return pipeline_checkpoint.retry_call(generate_pdf_from_doc.convert_doc_to_pdf, paths['doc'], paths['pdf'])
+
+
+def _print_html_to_pdf(member, retry_policy):
+    generate_pdf_from_html_with_playwright = import_stage('src.generate_pdf_from_html_with_playwright')
+    paths = _paths(member)
+    pipeline_checkpoint.configure_retries(**retry_policy)
+    return _flushed(pipeline_checkpoint.retry_call(
+        generate_pdf_from_html_with_playwright.generate_pdf_from_html_playwright, str(paths['html']), str(paths['pdf'])
+    ))
+
+
+def _init_worker(config):
+    # Pool processes may be spawned fresh (Windows), re-importing every stage
+    # module with its default paths, so re-apply the run's configuration.
+    if config is not None:
+        pipeline_config.apply_config(config)
+
+
+def _worker_context():
+    # Workers forked from this process would inherit the output writer and the
+    # archive packager without their threads; the fork server starts them from
+    # a clean process (preloaded with the stage modules under the daemon).
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context()
+
+
+def _timed(task, member, retry_policy):
+    started = time.perf_counter()
+    ok = task(member, retry_policy)
+    return ok, time.perf_counter() - started
+
+
+def stage_fingerprint(stage_name, member, input_key):
+    """Checkpoint fingerprint of one member's stage, computed as the serial stage does."""
+    paths = _paths(member)
+    if stage_name == 'html':
+        return import_stage('src.generate_html_reports').report_fingerprint(paths['json'])
+    if stage_name == 'doc':
+        return import_stage('src.generate_doc_from_html').doc_fingerprint(paths['json'], paths['html'])
+    return pipeline_checkpoint.file_fingerprint(paths[input_key])
+
+
+def build_stage_chain(pdf_backend=PDF_BACKEND_DOCX2PDF, stages=('html', 'doc', 'pdf'), chart_format='image'):
+    """Return the ordered ``(stage_name, pool_name, task, journal_stage, input_key)`` chain.
+
+    Only the requested ``stages`` are included; the chart capture rides along
+    with the ``doc`` stage it feeds, unless the chart is drawn natively.
+    """
+    chain = [('html', 'cpu', _render_html, pipeline_checkpoint.STAGE_HTML, 'json')]
+    if pdf_backend == PDF_BACKEND_PLAYWRIGHT:
+        chain.append(('pdf', 'browser', _print_html_to_pdf, pipeline_checkpoint.STAGE_PDF_FROM_HTML, 'html'))
+    else:
+        chain += [
+            ('chart', 'browser', _capture_chart, None, 'html'),
+            ('doc', 'cpu', _build_doc, pipeline_checkpoint.STAGE_DOC, 'json'),
+            ('pdf', 'converter', _convert_doc_to_pdf, pipeline_checkpoint.STAGE_PDF_FROM_DOC, 'doc'),
+        ]
+    capture_chart = 'doc' in stages and chart_format != 'native'
+    return [link for link in chain if link[0] in stages or (link[0] == 'chart' and capture_chart)]
+
+
+def run_pipelined(members=None, pdf_backend=PDF_BACKEND_DOCX2PDF, cpu_workers=None,
+                  browser_slots=DEFAULT_BROWSER_SLOTS, converter_slots=DEFAULT_CONVERTER_SLOTS, journal=None,
+                  stages=('html', 'doc', 'pdf'), config=None, on_artifact=None):
+    """Render HTML → DOC → PDF for each member with overlapping stages.
+
+    :param members: Member JSON stems to process; defaults to every JSON in
+        ``individual_reports/``.
+    :param stages: Subset of ``html``/``doc``/``pdf`` to run.
+    :param config: Pipeline config applied in every pool process.
+    :param journal: Optional ``CheckpointJournal``; stages already completed
+        from unchanged inputs are skipped and each outcome is recorded.
+    :param on_artifact: Optional callback given the output path of every stage
+        that succeeds (pool processes cannot reach the parent's listeners).
+    :return: Dict with per-stage total seconds, wall-clock seconds and the
+        list of failed ``(member, stage)`` pairs.
+    """
+    if members is None:
+        members = sorted(path.stem for path in JSON_DIR.glob('*.json'))
+    else:
+        members = sorted(members)
+    for directory in (HTML_DIR, DOC_DIR, PDF_DIR):
+        directory.mkdir(parents=True, exist_ok=True)
+
+    chain = build_stage_chain(pdf_backend, stages, config['chart_format'] if config else 'image')
+    retry_policy = dict(pipeline_checkpoint.RETRY_POLICY)
+    pool_sizes = {
+        'cpu': cpu_workers or os.cpu_count() or 1,
+        'browser': browser_slots,
+        'converter': converter_slots,
+    }
+    context = _worker_context()
+    pools = {
+        name: ProcessPoolExecutor(max_workers=size, mp_context=context, initializer=_init_worker,
+                                  initargs=(config,))
+        for name, size in pool_sizes.items()
+    }
+    stage_seconds = {name: 0.0 for name, *_ in chain}
+    failures = []
+    in_flight = {}
+    started = time.perf_counter()
+
+    def is_checkpointed(member, index):
+        # Stages without a journal key (the chart capture) only exist to feed
+        # the next stage, so they are skipped whenever that stage is.
+        name, _, _, journal_stage, input_key = chain[index]
+        if journal_stage is None:
+            return index + 1 < len(chain) and is_checkpointed(member, index + 1)
+        paths = _paths(member)
+        input_path = paths[input_key]
+        return (input_path.exists() and paths[name].exists()
+                and journal.is_done(journal_stage, input_path.name, stage_fingerprint(name, member, input_key)))
+
+    def advance(member, index):
+        # Submit the next stage that still needs work.
+        while journal and index < len(chain) and is_checkpointed(member, index):
+            index += 1
+        if index < len(chain):
+            _, pool_name, task, _, _ = chain[index]
+            in_flight[pools[pool_name].submit(_timed, task, member, retry_policy)] = (member, index)
+
+    try:
+        for member in members:
+            advance(member, 0)
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                member, index = in_flight.pop(future)
+                name, _, _, journal_stage, input_key = chain[index]
+                try:
+                    ok, elapsed = future.result()
+                    error = None if ok else f"{name} stage failed"
+                except Exception as e:
+                    ok, elapsed, error = False, 0.0, e
+                stage_seconds[name] += elapsed
+
+                if journal and journal_stage:
+                    input_path = _paths(member)[input_key]
+                    fingerprint = stage_fingerprint(name, member, input_key) if input_path.exists() else None
+                    journal.record(journal_stage, input_path.name, ok, fingerprint, error)
+
+                if ok:
+                    # The chart capture only feeds the DOC stage; its PNG is not an artifact.
+                    if on_artifact and journal_stage:
+                        on_artifact(_paths(member)[name])
+                    advance(member, index + 1)
+                else:
+                    failures.append((member, name))
+                    print(f"✗ {member}: {error}")
+    finally:
+        for pool in pools.values():
+            pool.shutdown(wait=True)
+
+    wall_seconds = time.perf_counter() - started
+    print("-" * 60)
+    print(f"Pipelined run: {len(members)} member(s), {len(failures)} failure(s), {wall_seconds:.1f}s wall clock")
+    for name, seconds in stage_seconds.items():
+        print(f"  {name:<6} {seconds:8.1f}s of worker time")
+    print(f"  (sum of stages {sum(stage_seconds.values()):.1f}s)")
+
+    return {'stage_seconds': stage_seconds, 'wall_seconds': wall_seconds, 'failures': failures}
+
+
+def main():
+    run_pipelined()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""Regenerate the reports of a few members without rerunning the cohort.
+
+When one person's data or feedback is corrected, ``regenerate_members()``
+rebuilds that member's HTML, DOCX and PDF in one pass (and the report JSON
+itself only if the ``reports`` stage is requested), ignoring checkpoints for
+those members only. Compiled templates stay cached in the
+process and the chart screenshot is reused from the chart cache when the
+member's sprint data did not change, so a single correction takes seconds.
+Outcomes are recorded in the checkpoint journal, so the next full run does
+not redo the regenerated members.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import src.pipeline_checkpoint as pipeline_checkpoint
+from src.pipeline_config import import_stage, member_stems
+from src.report_output_writer import announce, flush as flush_writes
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+JSON_DIR = BASE_DIR / 'transformed_data' / 'individual_reports'
+HTML_DIR = BASE_DIR / 'output_reports_html'
+DOC_DIR = BASE_DIR / 'output_reports_doc'
+PDF_DIR = BASE_DIR / 'output_reports_pdf'
+
+REGENERATION_STAGES = ('reports', 'html', 'doc', 'pdf')
+# The report JSON is kept unless 'reports' is asked for explicitly.
+DEFAULT_REGENERATION_STAGES = ('html', 'doc', 'pdf')
+
+
+def _record(journal, stage, item, ok, fingerprint, error=None):
+    # ``fingerprint`` is a callable returning the same fingerprint the stage
+    # itself checks, so the next pipeline run treats the item as done.
+    if journal:
+        journal.record(stage, item, ok, fingerprint() if ok else None, error)
+
+
+def _write_pdf(member, pdf_backend):
+    """Produce ``<member>.pdf`` with the configured backend."""
+    if pdf_backend == 'docx2pdf':
+        generate_pdf_from_doc = import_stage('src.generate_pdf_from_doc')
+        doc_path, pdf_path = DOC_DIR / f"{member}.docx", PDF_DIR / f"{member}.pdf"
+        ok = pipeline_checkpoint.retry_call(generate_pdf_from_doc.convert_doc_to_pdf, doc_path, pdf_path)
+        if ok:
+            announce(pdf_path)
+        return ok, pipeline_checkpoint.STAGE_PDF_FROM_DOC, doc_path.name, \
+            lambda: pipeline_checkpoint.file_fingerprint(doc_path)
+
+    # A team bundle of one member is just a Playwright print of that report.
+    generate_pdf_from_html_with_playwright = import_stage('src.generate_pdf_from_html_with_playwright')
+    html_path = HTML_DIR / f"{member}.html"
+    ok = pipeline_checkpoint.retry_call(generate_pdf_from_html_with_playwright.generate_pdf_from_html_playwright,
+                                        str(html_path), str(PDF_DIR / f"{member}.pdf"))
+    ok = bool(ok) and not flush_writes()
+    if pdf_backend == 'playwright_bundle':
+        # Recorded the way the bundle stage records members, so its next run
+        # treats this PDF as done.
+        json_path = JSON_DIR / f"{member}.json"
+        return ok, pipeline_checkpoint.STAGE_PDF_BUNDLE, member, \
+            lambda: import_stage('src.generate_html_reports').report_fingerprint(json_path)
+    return ok, pipeline_checkpoint.STAGE_PDF_FROM_HTML, html_path.name, \
+        lambda: pipeline_checkpoint.file_fingerprint(html_path)
+
+
+def regenerate_member(member, stages=DEFAULT_REGENERATION_STAGES, pdf_backend='docx2pdf', journal=None):
+    """Rebuild HTML, DOCX and PDF for one member report stem.
+
+    :return: True if every requested stage succeeded.
+    """
+    generate_html_reports = import_stage('src.generate_html_reports')
+    generate_doc_from_html = import_stage('src.generate_doc_from_html')
+
+    json_path = JSON_DIR / f"{member}.json"
+    html_path = HTML_DIR / f"{member}.html"
+    doc_path = DOC_DIR / f"{member}.docx"
+    if not json_path.exists():
+        print(f"✗ {member}: no report JSON at {json_path}")
+        return False
+
+    if 'html' in stages:
+        with open(json_path, 'r', encoding='utf-8') as json_file:
+            data = json.load(json_file)
+        ok = generate_html_reports.generate_evaluation_report(data, output_filename=html_path.name)
+        ok = ok and not flush_writes()
+        _record(journal, pipeline_checkpoint.STAGE_HTML, json_path.name, ok,
+                lambda: generate_html_reports.report_fingerprint(json_path))
+        if not ok:
+            return False
+
+    if 'doc' in stages:
+        try:
+            generate_doc_from_html.generate_doc_report(str(json_path), str(doc_path),
+                                                       str(html_path) if html_path.exists() else None)
+            error = next(iter(flush_writes().values()), None)
+        except Exception as e:
+            error = e
+        _record(journal, pipeline_checkpoint.STAGE_DOC, json_path.name, error is None,
+                lambda: generate_doc_from_html.doc_fingerprint(json_path, html_path), error)
+        if error:
+            print(f"✗ {member}: {error}")
+            return False
+
+    if 'pdf' in stages:
+        ok, journal_stage, journal_item, fingerprint = _write_pdf(member, pdf_backend)
+        _record(journal, journal_stage, journal_item, ok, fingerprint,
+                None if ok else "PDF generation failed")
+        if not ok:
+            return False
+    return True
+
+
+def regenerate_members(names, stages=DEFAULT_REGENERATION_STAGES, pdf_backend='docx2pdf', journal=None):
+    """Rebuild every requested stage for the given members only.
+
+    :param names: Member names or report stems (``"Hanan Aljabri"``, ``hanan_aljabri_report``).
+    :param stages: Subset of ``reports``/``html``/``doc``/``pdf`` to rebuild.
+    :param pdf_backend: ``docx2pdf``, or ``playwright`` / ``playwright_bundle``
+        to print the HTML report.
+    :param journal: Optional ``CheckpointJournal`` to record the outcomes in.
+    :return: Set of member stems that were fully regenerated.
+    """
+    members = member_stems(names)
+    if not members:
+        print("No members given to regenerate.")
+        return set()
+    for directory in (HTML_DIR, DOC_DIR, PDF_DIR):
+        directory.mkdir(parents=True, exist_ok=True)
+
+    if 'reports' in stages:
+        # Only when asked for: rebuilding from the aggregate would discard
+        # hand edits to the member JSON (e.g. trainers' feedback). Rebuilt
+        # without the journal so checkpoints cannot skip these members; the
+        # stage raises if a report cannot be written.
+        transform_sp_json_to_eval_report_json = import_stage('src.transform_sp_json_to_eval_report_json')
+        transform_sp_json_to_eval_report_json.generate_member_reports(members=members)
+
+    if set(stages) & {'html', 'doc', 'pdf'}:
+        _, invalid = import_stage('src.validate_report_json').validate_reports(members)
+        for member, errors in invalid.items():
+            print(f"✗ {member}: invalid report JSON, skipped ({'; '.join(errors)})")
+        members = members - set(invalid)
+
+    regenerated = set()
+    for member in sorted(members):
+        print(f"Regenerating {member}...")
+        if regenerate_member(member, stages, pdf_backend, journal):
+            regenerated.add(member)
+            print(f"✓ Regenerated {member}")
+    return regenerated
+
+
+def main(names=None, journal=None):
+    regenerated = regenerate_members(names or [], journal=journal)
+    print(f"\nRegeneration complete: {len(regenerated)} member(s) rebuilt")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,315 @@
+"""SQLite-backed work queue for sharded report rendering.
+
+``enqueue_members()`` records one job per member JSON found in
+``transformed_data/individual_reports/``. Any number of worker processes then
+call ``run_worker()`` to claim shards of members, render HTML → DOCX → PDF and
+record the outcome. Claims carry a lease so that members held by a crashed
+worker are handed out again once the lease expires, and finished members are
+not rendered again until their JSON changes, which makes the queue resumable
+after any interruption.
+
+The queue needs no broker or server process, but SQLite relies on file locks
+that are unreliable on network filesystems (SMB/CIFS, NFS), where two workers
+could claim the same shard. Keep the queue file on a local disk and run the
+workers on that host, or put it on storage whose locking is known to work.
+"""
+
+import os
+import json
+import socket
+import sqlite3
+import time
+from pathlib import Path
+
+from src.pipeline_checkpoint import file_fingerprint
+from src.pipeline_config import import_stage
+from src.report_output_writer import flush as flush_writes
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+QUEUE_DB_PATH = BASE_DIR / 'transformed_data' / 'render_queue.sqlite3'
+JSON_DIR = BASE_DIR / 'transformed_data' / 'individual_reports'
+HTML_DIR = BASE_DIR / 'output_reports_html'
+DOC_DIR = BASE_DIR / 'output_reports_doc'
+PDF_DIR = BASE_DIR / 'output_reports_pdf'
+
+DEFAULT_SHARD_SIZE = 10
+DEFAULT_LEASE_SECONDS = 15 * 60
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Job states: pending -> claimed -> done, or back to pending on failure until
+# the attempt budget is spent, after which the job is parked as failed.
+STATUS_PENDING = 'pending'
+STATUS_CLAIMED = 'claimed'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+
+def connect(db_path=QUEUE_DB_PATH):
+    """Open the queue database, creating the schema on first use."""
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path), timeout=60, isolation_level=None)
+    conn.execute('PRAGMA busy_timeout = 60000')
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS render_jobs (
+            member TEXT PRIMARY KEY,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker TEXT,
+            lease_expires REAL,
+            last_error TEXT,
+            updated_at REAL,
+            fingerprint TEXT
+        )
+        """
+    )
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(render_jobs)')}
+    if 'fingerprint' not in columns:
+        # Queue files created before jobs carried their input fingerprint.
+        conn.execute('ALTER TABLE render_jobs ADD COLUMN fingerprint TEXT')
+    return conn
+
+
+def enqueue_members(db_path=QUEUE_DB_PATH, json_dir=None, retry_failed=False, members=None, reset=False):
+    """Queue every member JSON that is new or has changed since it was rendered.
+
+    Each job carries the fingerprint of the JSON it was queued or rendered
+    from. Finished or failed members whose JSON has changed since (stage 2 ran
+    again) are queued again with a fresh attempt budget; other queued members
+    keep their state, so re-running the enqueue step never re-renders
+    unchanged work. With ``retry_failed`` the jobs parked as failed get a
+    fresh attempt budget, and with ``reset`` every member is queued again
+    whatever its state. Members a worker currently holds are left alone.
+    ``members`` optionally restricts queuing to the given report stems.
+
+    :return: Number of members queued (new, changed or reset).
+    """
+    json_dir = Path(json_dir or JSON_DIR)
+    fingerprints = {path.stem: file_fingerprint(path) for path in sorted(json_dir.glob('*.json'))
+                    if members is None or path.stem in members}
+    now = time.time()
+    conn = connect(db_path)
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        known = dict(conn.execute('SELECT member, status FROM render_jobs').fetchall())
+        queued = 0
+        for member, fingerprint in fingerprints.items():
+            if member not in known:
+                conn.execute('INSERT INTO render_jobs (member, updated_at, fingerprint) VALUES (?, ?, ?)',
+                             (member, now, fingerprint))
+                queued += 1
+                continue
+            if known[member] == STATUS_CLAIMED:
+                continue
+            requeue = reset or (retry_failed and known[member] == STATUS_FAILED)
+            cursor = conn.execute(
+                """
+                UPDATE render_jobs
+                SET status = ?, attempts = 0, last_error = NULL, fingerprint = ?, updated_at = ?
+                WHERE member = ? AND (? OR fingerprint IS NOT ?)
+                """,
+                (STATUS_PENDING, fingerprint, now, member, requeue, fingerprint),
+            )
+            if cursor.rowcount and known[member] != STATUS_PENDING:
+                queued += 1
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
+    return queued
+
+
+def claim_shard(conn, worker_id, shard_size=DEFAULT_SHARD_SIZE, lease_seconds=DEFAULT_LEASE_SECONDS,
+                max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Atomically claim up to ``shard_size`` pending or lease-expired jobs.
+
+    A lease-expired job that has used up its attempts is parked as failed
+    instead: its worker crashed or hung on it every time, so ``mark_failed()``
+    never ran for it.
+    """
+    now = time.time()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        conn.execute(
+            """
+            UPDATE render_jobs
+            SET status = ?, last_error = ?, updated_at = ?
+            WHERE status = ? AND lease_expires < ? AND attempts >= ?
+            """,
+            (STATUS_FAILED, f"Lease expired on every attempt ({max_attempts}); the worker crashed or hung",
+             now, STATUS_CLAIMED, now, max_attempts),
+        )
+        rows = conn.execute(
+            """
+            SELECT member FROM render_jobs
+            WHERE status = ? OR (status = ? AND lease_expires < ?)
+            ORDER BY member
+            LIMIT ?
+            """,
+            (STATUS_PENDING, STATUS_CLAIMED, now, shard_size),
+        ).fetchall()
+        members = [row[0] for row in rows]
+        conn.executemany(
+            """
+            UPDATE render_jobs
+            SET status = ?, attempts = attempts + 1, worker = ?, lease_expires = ?, updated_at = ?
+            WHERE member = ?
+            """,
+            [(STATUS_CLAIMED, worker_id, now + lease_seconds, now, member) for member in members],
+        )
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+    return members
+
+
+def renew_lease(conn, members, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """Extend the leases of the jobs this worker still holds.
+
+    Called with every member of the shard not yet rendered, so members waiting
+    their turn do not lose their lease to a slow member ahead of them.
+    """
+    now = time.time()
+    conn.executemany(
+        'UPDATE render_jobs SET lease_expires = ?, updated_at = ? WHERE member = ? AND worker = ? AND status = ?',
+        [(now + lease_seconds, now, member, worker_id, STATUS_CLAIMED) for member in members],
+    )
+
+
+def mark_done(conn, member, worker_id, fingerprint):
+    """Record the member as rendered from the JSON with ``fingerprint``."""
+    conn.execute(
+        """
+        UPDATE render_jobs
+        SET status = ?, last_error = NULL, fingerprint = ?, updated_at = ?
+        WHERE member = ? AND worker = ?
+        """,
+        (STATUS_DONE, fingerprint, time.time(), member, worker_id),
+    )
+
+
+def mark_failed(conn, member, worker_id, error, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Return the job to the queue, or park it as failed once out of attempts."""
+    conn.execute(
+        """
+        UPDATE render_jobs
+        SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+            last_error = ?, updated_at = ?
+        WHERE member = ? AND worker = ?
+        """,
+        (max_attempts, STATUS_FAILED, STATUS_PENDING, str(error), time.time(), member, worker_id),
+    )
+
+
+def queue_status(db_path=QUEUE_DB_PATH):
+    """Return a ``{status: count}`` summary of the queue."""
+    conn = connect(db_path)
+    try:
+        rows = conn.execute('SELECT status, COUNT(*) FROM render_jobs GROUP BY status').fetchall()
+    finally:
+        conn.close()
+    return dict(rows)
+
+
+def render_member(member, pdf_backend='docx2pdf', output_formats=('html', 'docx', 'pdf')):
+    """Render the configured outputs for a single member JSON stem.
+
+    Follows the same rules as ``main_app.run_render_stages()``: the DOCX is
+    built if it is wanted or the docx2pdf backend needs it, and the PDF is
+    converted from the DOCX or printed from the HTML with Playwright. With
+    ``playwright_bundle`` a member's "bundle" is just its own report, so it is
+    printed the same way as with ``playwright``.
+    """
+    generate_html_reports = import_stage('src.generate_html_reports')
+
+    json_path = JSON_DIR / f"{member}.json"
+    html_path = HTML_DIR / f"{member}.html"
+    doc_path = DOC_DIR / f"{member}.docx"
+    pdf_path = PDF_DIR / f"{member}.pdf"
+    formats = set(output_formats)
+
+    with open(json_path, 'r', encoding='utf-8') as json_file:
+        data = json.load(json_file)
+    errors = import_stage('src.validate_report_json').validate_report(data)
+    if errors:
+        raise RuntimeError(f"Invalid report JSON: {'; '.join(errors)}")
+
+    generate_html_reports.generate_evaluation_report(data, output_filename=html_path.name)
+    if flush_writes() or not html_path.exists():
+        raise RuntimeError(f"HTML report was not generated for {member}")
+
+    if 'docx' in formats or ('pdf' in formats and pdf_backend == 'docx2pdf'):
+        generate_doc_from_html = import_stage('src.generate_doc_from_html')
+        generate_doc_from_html.generate_doc_report(str(json_path), str(doc_path), str(html_path))
+        if flush_writes():
+            raise RuntimeError(f"DOC report could not be written for {member}")
+
+    if 'pdf' not in formats:
+        return
+    if pdf_backend == 'docx2pdf':
+        if not import_stage('src.generate_pdf_from_doc').convert_doc_to_pdf(doc_path, pdf_path):
+            raise RuntimeError(f"PDF conversion failed for {member}")
+    else:
+        generate_pdf_from_html_with_playwright = import_stage('src.generate_pdf_from_html_with_playwright')
+        printed = generate_pdf_from_html_with_playwright.generate_pdf_from_html_playwright(str(html_path),
+                                                                                           str(pdf_path))
+        if not printed or flush_writes():
+            raise RuntimeError(f"PDF printing failed for {member}")
+
+
+def run_worker(db_path=QUEUE_DB_PATH, shard_size=DEFAULT_SHARD_SIZE, lease_seconds=DEFAULT_LEASE_SECONDS,
+               max_attempts=DEFAULT_MAX_ATTEMPTS, worker_id=None, pdf_backend='docx2pdf',
+               output_formats=('html', 'docx', 'pdf')):
+    """Claim and render shards until the queue has no claimable work left.
+
+    ``pdf_backend`` and ``output_formats`` select what each member is rendered
+    to, as in a normal pipeline run.
+
+    :return: Tuple of (rendered, failed) counts for this worker.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    for directory in (HTML_DIR, DOC_DIR, PDF_DIR):
+        directory.mkdir(parents=True, exist_ok=True)
+
+    rendered = 0
+    failed = 0
+    conn = connect(db_path)
+    try:
+        while True:
+            shard = claim_shard(conn, worker_id, shard_size, lease_seconds, max_attempts)
+            if not shard:
+                break
+            print(f"[{worker_id}] Claimed {len(shard)} member(s)")
+            for index, member in enumerate(shard):
+                renew_lease(conn, shard[index:], worker_id, lease_seconds)
+                try:
+                    # Taken before rendering, so a JSON rewritten meanwhile is
+                    # seen as changed by the next enqueue.
+                    fingerprint = file_fingerprint(JSON_DIR / f"{member}.json")
+                    render_member(member, pdf_backend, output_formats)
+                    mark_done(conn, member, worker_id, fingerprint)
+                    rendered += 1
+                except Exception as e:
+                    mark_failed(conn, member, worker_id, e, max_attempts)
+                    failed += 1
+                    print(f"[{worker_id}] ✗ {member}: {e}")
+    finally:
+        conn.close()
+
+    print(f"[{worker_id}] Worker finished: {rendered} rendered, {failed} failed")
+    return rendered, failed
+
+
+def main():
+    added = enqueue_members()
+    print(f"Queued {added} member(s) in {QUEUE_DB_PATH}")
+    run_worker()
+    print(f"Queue status: {queue_status()}")
+
+
+if __name__ == '__main__':
+    main()
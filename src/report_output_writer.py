@@ -0,0 +1,234 @@
+"""Shared background writer for every file the pipeline produces.
+
+Stages hand finished artifacts (JSON payloads, HTML strings, DOCX documents,
+PDF bytes) to ``get_writer()`` and carry on with the next member while a
+single background thread puts them on disk. Each file is written to a
+temporary name in its target directory and renamed into place, so readers never
+see a half-written report. Queued writes are committed in batches: the data of
+the whole batch is fsynced, the files are renamed, and each touched directory
+is fsynced once, which keeps durable writes cheap on slow network shares.
+
+Call ``flush()`` before anything reads the outputs back (the next stage, or
+another process); it returns the writes that failed since the previous flush.
+Consumers that want each finished file as soon as it lands (the archive
+packager) register with ``add_commit_listener()``.
+"""
+
+import atexit
+import errno
+import io
+import itertools
+import json
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+
+
+# Durable writes fsync file data and directories; turn off for scratch runs.
+FSYNC_WRITES = True
+
+DEFAULT_BATCH_SIZE = 32
+# Bound on queued-but-unwritten artifacts, so a slow disk applies backpressure
+# instead of letting rendered reports pile up in memory.
+DEFAULT_MAX_PENDING = 256
+
+
+class ReportOutputWriter:
+    """Background-thread writer with atomic renames and batched fsync."""
+
+    def __init__(self, fsync=True, batch_size=DEFAULT_BATCH_SIZE, max_pending=DEFAULT_MAX_PENDING):
+        self.fsync = fsync
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._failures = {}
+        self._failures_lock = threading.Lock()
+        self._temp_ids = itertools.count()
+        self._thread = threading.Thread(target=self._run, name='report-output-writer', daemon=True)
+        self._thread.start()
+
+    def write_bytes(self, path, data):
+        """Queue ``data`` to be written to ``path``; returns a Future of the path."""
+        future = Future()
+        self._queue.put((Path(path), bytes(data), future))
+        return future
+
+    def write_text(self, path, text, encoding='utf-8'):
+        return self.write_bytes(path, text.encode(encoding))
+
+    def write_json(self, path, data, indent=2):
+        # Serialized on the caller's thread so later changes to ``data`` cannot
+        # leak into the file.
+        return self.write_text(path, json.dumps(data, indent=indent, ensure_ascii=False))
+
+    def save_docx(self, document, path):
+        """Serialize a python-docx ``Document`` in memory and queue it."""
+        buffer = io.BytesIO()
+        document.save(buffer)
+        return self.write_bytes(path, buffer.getvalue())
+
+    def flush(self):
+        """Wait until every queued write is on disk.
+
+        :return: ``{path: exception}`` for writes that failed since the last flush.
+        """
+        self._queue.join()
+        with self._failures_lock:
+            failures, self._failures = self._failures, {}
+        return failures
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._commit_batch(batch)
+            except Exception as e:
+                # Never let one bad batch stop the thread: flush() would wait forever.
+                for path, _, future in batch:
+                    if not future.done():
+                        self._fail(path, future, e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _fail(self, path, future, error):
+        with self._failures_lock:
+            self._failures[path] = error
+        if not future.done():
+            future.set_exception(error)
+
+    def _commit_batch(self, batch):
+        staged = []
+        for path, data, future in batch:
+            temp_path = path.with_name(f".{path.name}.{os.getpid()}.{next(self._temp_ids)}.tmp")
+            handle = None
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                handle = open(temp_path, 'wb')
+                handle.write(data)
+                handle.flush()
+                staged.append((path, temp_path, handle, future))
+            except Exception as e:
+                if handle is not None:
+                    handle.close()
+                if temp_path.exists():
+                    temp_path.unlink()
+                self._fail(path, future, e)
+
+        renamed = []
+        for path, temp_path, handle, future in staged:
+            try:
+                if self.fsync:
+                    os.fsync(handle.fileno())
+                handle.close()
+                os.replace(temp_path, path)
+                renamed.append((path, future))
+            except Exception as e:
+                handle.close()
+                if temp_path.exists():
+                    temp_path.unlink()
+                self._fail(path, future, e)
+
+        # Directory fsync makes the renames durable; only POSIX supports it.
+        directory_errors = {}
+        if self.fsync and os.name == 'posix':
+            for directory in {path.parent for path, _ in renamed}:
+                try:
+                    _fsync_directory(directory)
+                except OSError as e:
+                    directory_errors[directory] = e
+
+        for path, future in renamed:
+            error = directory_errors.get(path.parent)
+            if error:
+                self._fail(path, future, error)
+            else:
+                future.set_result(path)
+                _notify_listeners(path)
+
+
+def _fsync_directory(directory):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    except OSError as e:
+        # Some network filesystems (CIFS, NFS) cannot fsync a directory; the
+        # rename is still as durable as that filesystem makes it.
+        if e.errno not in (errno.EINVAL, errno.ENOTSUP, errno.EOPNOTSUPP):
+            raise
+    finally:
+        os.close(fd)
+
+
+_shared_writer = None
+_shared_writer_lock = threading.Lock()
+_commit_listeners = []
+
+
+def add_commit_listener(callback):
+    """Call ``callback(path)`` for every file committed from now on.
+
+    Callbacks run on the writer thread and must not block.
+    """
+    _commit_listeners.append(callback)
+
+
+def remove_commit_listener(callback):
+    if callback in _commit_listeners:
+        _commit_listeners.remove(callback)
+
+
+def announce(path):
+    """Tell listeners about a finished file written without the writer (docx2pdf output)."""
+    _notify_listeners(Path(path))
+
+
+def _notify_listeners(path):
+    for callback in list(_commit_listeners):
+        try:
+            callback(path)
+        except Exception as e:
+            print(f"✗ Output listener failed for {path.name}: {e}")
+
+
+def get_writer():
+    """Return the process-wide writer, starting it on first use.
+
+    The writer outlives a single run in the pipeline daemon, so it picks up
+    the current ``FSYNC_WRITES`` setting on every call.
+    """
+    global _shared_writer
+    with _shared_writer_lock:
+        if _shared_writer is None:
+            _shared_writer = ReportOutputWriter(fsync=FSYNC_WRITES)
+        _shared_writer.fsync = FSYNC_WRITES
+        return _shared_writer
+
+
+def flush():
+    """Flush the process-wide writer (a no-op if nothing was ever written)."""
+    if _shared_writer is None:
+        return {}
+    return _shared_writer.flush()
+
+
+def _reset_after_fork():
+    # A forked child inherits the writer object but not its thread, so a
+    # flush there would wait forever; it also inherits the parent's listeners
+    # (the archive packager), which must only see the parent's files. The
+    # child starts its own writer on first use.
+    global _shared_writer, _shared_writer_lock
+    _shared_writer = None
+    _shared_writer_lock = threading.Lock()
+    _commit_listeners.clear()
+
+
+atexit.register(flush)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
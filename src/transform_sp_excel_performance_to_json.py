@@ -1,12 +1,30 @@
 import os
 import json
+import hashlib
+import zipfile
+import posixpath
 import openpyxl
+import xml.etree.ElementTree as ET
+from collections import namedtuple
 from pathlib import Path
 import calendar
 
+from src.pipeline_checkpoint import STAGE_EXCEL_TO_JSON, file_fingerprint
+from src.report_output_writer import get_writer, flush as flush_writes
+
 # Define directories
-INPUT_DIR = "./input_data"
-OUTPUT_DIR = "./transformed_data/sharepoint_excel_to_json_data"
+BASE_DIR = Path(__file__).resolve().parent.parent
+INPUT_DIR = str(BASE_DIR / "input_data")
+OUTPUT_DIR = str(BASE_DIR / "transformed_data" / "sharepoint_excel_to_json_data")
+SHEET_CACHE_DIR = str(BASE_DIR / "transformed_data" / "excel_sheet_cache")
+
+# Bump when the extraction logic changes so cached sheet data is not reused
+SHEET_CACHE_VERSION = 2
+
+_SPREADSHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_RELATIONSHIP_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PACKAGE_RELS_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_SHARED_STRINGS_PART = "xl/sharedStrings.xml"
 
 # Valid month names for validation
 VALID_MONTHS = [month.lower() for month in calendar.month_name if month] + \
@@ -110,39 +128,202 @@ def extract_row_data(sheet, row_num):
     
     return data
 
-def process_excel_file(file_path):
-    """Process a single Excel file and return structured data."""
-    workbook = openpyxl.load_workbook(file_path, data_only=True)
+_Cell = namedtuple("_Cell", "value")
+
+
+class _SheetGrid:
+    """Cell values of a read-only worksheet with the ``cell()`` / ``max_column``
+    access the extractors above use on regular worksheets."""
+
+    def __init__(self, rows):
+        self._rows = rows
+        self.max_column = max((len(row) for row in rows), default=0)
+
+    def cell(self, row, column):
+        if row < 1 or column < 1 or row > len(self._rows) or column > len(self._rows[row - 1]):
+            return _Cell(None)
+        return _Cell(self._rows[row - 1][column - 1])
+
+
+def _sheet_part_keys(file_path):
+    """Map sheet names to the CRC-32 of their worksheet part.
+
+    The CRCs come from the zip directory, so nothing but the small workbook
+    and relationship parts is decompressed. Cell text lives in the shared
+    strings part; its CRC is returned alongside and checked separately by
+    ``_shared_strings_state()``.
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        crcs = {info.filename: info.CRC for info in archive.infolist()}
+        workbook_xml = ET.fromstring(archive.read("xl/workbook.xml"))
+        rels_xml = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+
+    targets = {}
+    for rel in rels_xml.iter(f"{_PACKAGE_RELS_NS}Relationship"):
+        target = rel.get("Target", "")
+        targets[rel.get("Id")] = target.lstrip("/") if target.startswith("/") else posixpath.normpath(f"xl/{target}")
+
+    keys = {}
+    for sheet in workbook_xml.iter(f"{_SPREADSHEET_NS}sheet"):
+        part = targets.get(sheet.get(f"{_RELATIONSHIP_NS}id"))
+        if part in crcs:
+            keys[sheet.get("name")] = f"{crcs[part]:08x}"
+    return keys, crcs.get(_SHARED_STRINGS_PART, 0)
+
+
+def _shared_strings_digest(file_path, prefix_count=None):
+    """Hash the shared-string table of a workbook.
+
+    :return: Tuple of (number of strings, digest of all strings, digest of the
+        first ``prefix_count`` strings or None if the table is shorter).
+    """
+    digest = hashlib.sha256()
+    prefix = digest.hexdigest() if prefix_count == 0 else None
+    count = 0
+    with zipfile.ZipFile(file_path) as archive:
+        if _SHARED_STRINGS_PART not in archive.namelist():
+            return count, digest.hexdigest(), prefix
+        with archive.open(_SHARED_STRINGS_PART) as part:
+            for _, element in ET.iterparse(part):
+                if element.tag != f"{_SPREADSHEET_NS}si":
+                    continue
+                digest.update(repr("".join(element.itertext())).encode("utf-8"))
+                element.clear()
+                count += 1
+                if count == prefix_count:
+                    prefix = digest.hexdigest()
+    return count, digest.hexdigest(), prefix
+
+
+def _shared_strings_state(file_path, crc, cached):
+    """Describe the shared-string table and whether cached sheets still fit it.
+
+    Excel adds new strings to the end of the table, so a new text cell in the
+    current month leaves the indices every other sheet refers to untouched.
+    The table is compatible with the cache if it starts with the cached
+    strings; a sheet whose part is unchanged then still reads the same text.
+
+    :return: Tuple of (state to cache, whether cached sheets can be reused).
+    """
+    if cached and cached.get("crc") == crc:
+        return cached, True
+    count, digest, prefix = _shared_strings_digest(file_path, cached.get("count") if cached else None)
+    return {"crc": crc, "count": count, "digest": digest}, bool(cached) and prefix == cached.get("digest")
+
+
+def _sheet_values(sheet):
+    """Read a read-only worksheet's values and hash them."""
+    # Stored dimensions are not always accurate; let openpyxl scan the sheet.
+    sheet.reset_dimensions()
+    digest = hashlib.sha256()
+    rows = []
+    for row in sheet.iter_rows(values_only=True):
+        rows.append(row)
+        digest.update(repr(row).encode("utf-8"))
+    return rows, digest.hexdigest()
+
+
+def _sheet_cache_path(file_path):
+    return Path(SHEET_CACHE_DIR) / f"{Path(file_path).stem}.json"
+
+
+def _load_sheet_cache(file_path):
+    cache_path = _sheet_cache_path(file_path)
+    if not cache_path.exists():
+        return {}
+    try:
+        with open(cache_path, "r", encoding="utf-8") as cache_file:
+            cache = json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+    return cache if cache.get("version") == SHEET_CACHE_VERSION else {}
+
+
+def extract_sheet_data(sheet):
+    """Extract member rows and sprint info from one month sheet."""
+    sheet_data = {}
+    
+    # Extract team members and their row numbers, and sprint start row
+    team_members, sprint_start_row = extract_team_members(sheet)
+    
+    for member_name, row_num in team_members:
+        # Extract all data for this team member
+        member_data = extract_row_data(sheet, row_num)
+        sheet_data[member_name] = member_data
+    
+    # Extract sprint information
+    sprint_info = extract_sprint_info(sheet, sprint_start_row)
+    if sprint_info:
+        sheet_data["sprint_info"] = sprint_info
+    
+    return sheet_data
+
+
+def process_excel_file(file_path, use_cache=True):
+    """Process a single Excel file and return structured data.
+
+    Parsed sheets are cached in ``SHEET_CACHE_DIR``. A sheet whose workbook
+    part is unchanged is taken from the cache without being read, as long as
+    the shared-string table was only added to. A sheet whose
+    part changed but whose cell values did not (the workbook was just resaved)
+    is read but not re-extracted. Past months are frozen, so normally only the
+    current month's sheet is extracted again.
+    """
+    cache = _load_sheet_cache(file_path) if use_cache else {}
+    cached_sheets = cache.get("sheets", {})
+    part_keys, strings_state, strings_reusable = {}, None, False
+    if use_cache:
+        part_keys, strings_crc = _sheet_part_keys(file_path)
+        strings_state, strings_reusable = _shared_strings_state(file_path, strings_crc,
+                                                                cache.get("shared_strings"))
+    # The workbook is only opened if some sheet actually has to be read.
+    workbook = None
+    if not part_keys:
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    sheet_names = list(part_keys) if part_keys else workbook.sheetnames
     result = {}
+    sheets_cache = {}
+    extracted = 0
     
-    for sheet_name in workbook.sheetnames:
+    for sheet_name in sheet_names:
         # Skip sheets without valid month names
         if not is_valid_month_sheet(sheet_name):
             continue
         
-        sheet = workbook[sheet_name]
-        sheet_data = {}
-        
-        # Extract team members and their row numbers, and sprint start row
-        team_members, sprint_start_row = extract_team_members(sheet)
-        
-        for member_name, row_num in team_members:
-            # Extract all data for this team member
-            member_data = extract_row_data(sheet, row_num)
-            sheet_data[member_name] = member_data
-        
-        # Extract sprint information
-        sprint_info = extract_sprint_info(sheet, sprint_start_row)
-        if sprint_info:
-            sheet_data["sprint_info"] = sprint_info
+        cached = cached_sheets.get(sheet_name)
+        part_key = part_keys.get(sheet_name)
+        if cached and part_key and strings_reusable and cached.get("part_key") == part_key:
+            sheet_data, value_hash = cached["sheet_data"], cached["value_hash"]
+        else:
+            if workbook is None:
+                workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+            rows, value_hash = _sheet_values(workbook[sheet_name])
+            if cached and cached.get("value_hash") == value_hash:
+                sheet_data = cached["sheet_data"]
+            else:
+                sheet_data = extract_sheet_data(_SheetGrid(rows))
+                extracted += 1
         
+        sheets_cache[sheet_name] = {"part_key": part_key, "value_hash": value_hash, "sheet_data": sheet_data}
         result[sheet_name] = sheet_data
     
-    workbook.close()
+    if workbook is not None:
+        workbook.close()
+    
+    if use_cache:
+        get_writer().write_json(_sheet_cache_path(file_path),
+                                {"version": SHEET_CACHE_VERSION, "shared_strings": strings_state,
+                                 "sheets": sheets_cache}, indent=None)
+        print(f"  Extracted {extracted} of {len(result)} month sheet(s), {len(result) - extracted} unchanged (sheet cache)")
     return result
 
-def main():
-    """Main function to process all Excel files."""
+
+def main(journal=None):
+    """Main function to process all Excel files.
+
+    :param journal: Optional ``CheckpointJournal``; workbooks already converted
+        from an unchanged file are skipped and each outcome is recorded.
+    """
     # Create output directory if it doesn't exist
     Path(OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
     
@@ -157,10 +338,16 @@ def main():
         print(f"No .xlsx files found in '{INPUT_DIR}'.")
         return
     
+    written = []
     for filename in xlsx_files:
         input_path = os.path.join(INPUT_DIR, filename)
         output_filename = filename.replace('.xlsx', '.json')
         output_path = os.path.join(OUTPUT_DIR, output_filename)
+        fingerprint = file_fingerprint(input_path)
+        
+        if journal and journal.is_done(STAGE_EXCEL_TO_JSON, filename, fingerprint) and os.path.exists(output_path):
+            print(f"Skipping (checkpointed): {filename}")
+            continue
         
         print(f"Processing: {filename}")
         
@@ -168,14 +355,24 @@ def main():
             # Process the Excel file
             data = process_excel_file(input_path)
             
-            # Write to JSON file
-            with open(output_path, 'w', encoding='utf-8') as json_file:
-                json.dump(data, json_file, indent=4, ensure_ascii=False)
-            
-            print(f"  ✓ Generated: {output_filename}")
+            # Queue the JSON file; it is written while the next workbook is parsed
+            get_writer().write_json(output_path, data, indent=4)
+            written.append((filename, output_filename, output_path, fingerprint))
         
         except Exception as e:
             print(f"  ✗ Error processing {filename}: {str(e)}")
+            if journal:
+                journal.record(STAGE_EXCEL_TO_JSON, filename, False, fingerprint, e)
+    
+    failures = flush_writes()
+    for filename, output_filename, output_path, fingerprint in written:
+        error = failures.get(Path(output_path))
+        if error:
+            print(f"  ✗ Error writing {output_filename}: {error}")
+        else:
+            print(f"  ✓ Generated: {output_filename}")
+        if journal:
+            journal.record(STAGE_EXCEL_TO_JSON, filename, error is None, fingerprint, error)
     
     print("\nTransformation complete!")
 
@@ -3,14 +3,26 @@
 This script ingests the aggregated team performance JSON that is generated by
 ``transform_sp_excel_performance_to_json.py`` and produces one JSON file per
 team member that matches the report schema defined in ``schema/report_schema.json``.
+
+With ``STREAM_SOURCE`` enabled the aggregate JSON is never loaded whole: it is
+parsed incrementally, one member-month entry at a time, into a temporary
+SQLite file, and member payloads are then built and written one member at a
+time. Peak memory stays roughly constant per member instead of growing with
+the number of months and teams in the aggregate.
 """
 
 from __future__ import annotations
 
 import json
+import sqlite3
+import tempfile
+import tracemalloc
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from src.pipeline_checkpoint import STAGE_EVAL_REPORT_JSON, stage_fingerprint
+from src.report_output_writer import get_writer, flush as flush_writes
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -27,6 +39,9 @@ MONTHLY_EVAL_WITHOUT_QUIZ_KEY = "Monthly Evaluation (out of 50%)"
 FINAL_EVAL_KEY = "Final Evaluation (out of 90%)"
 TOTAL_SCORE_KEY = "Total Score (out of 100%)"
 
+# Team label printed on every report generated from SOURCE_JSON.
+TEAM_NAME = "Team Code Orbit (AIOps)"
+
 # Months we currently care about for this export pipeline.
 TARGET_MONTHS = (
 	"April 2025",
@@ -43,6 +58,16 @@ FINAL_EVAL_MONTHS = (
 	"October 2025"
 )
 
+# Parse the aggregate JSON incrementally instead of loading it whole.
+STREAM_SOURCE = False
+STREAM_CHUNK_SIZE = 1 << 16
+# Characters a JSON number can contain.
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+# Queued report writes are flushed (and their outcomes recorded) in batches of
+# this many members, so bookkeeping does not grow with the cohort either.
+RECORD_BATCH_SIZE = 256
+
 
 def _safe_float(value: str) -> Optional[float]:
 	"""Convert numeric strings to floats, returning None for blanks or N/A."""
@@ -79,6 +104,146 @@ def _collect_member_names(team_payload: Dict[str, dict]) -> List[str]:
 	return sorted(members)
 
 
+class _ChunkedJsonReader:
+	"""Minimal pull parser for the two-level ``{month: {member: value}}`` layout.
+
+	Only one member-month value is decoded at a time; the text buffer holds at
+	most one chunk plus the value currently being decoded.
+	"""
+
+	def __init__(self, handle: TextIO, chunk_size: int = STREAM_CHUNK_SIZE) -> None:
+		self._handle = handle
+		self._chunk_size = chunk_size
+		self._decoder = json.JSONDecoder()
+		self._buffer = ""
+		self._pos = 0
+		self._eof = False
+
+	def _fill(self) -> bool:
+		if self._eof:
+			return False
+		chunk = self._handle.read(self._chunk_size)
+		if not chunk:
+			self._eof = True
+			return False
+		self._buffer = self._buffer[self._pos:] + chunk
+		self._pos = 0
+		return True
+
+	def _peek(self) -> str:
+		while True:
+			while self._pos < len(self._buffer) and self._buffer[self._pos] in " \t\r\n":
+				self._pos += 1
+			if self._pos < len(self._buffer):
+				return self._buffer[self._pos]
+			if not self._fill():
+				raise ValueError("Unexpected end of JSON input")
+
+	def _expect(self, char: str) -> None:
+		found = self._peek()
+		if found != char:
+			raise ValueError(f"Expected '{char}' in JSON input, found '{found}'")
+		self._pos += 1
+
+	def _number_complete(self) -> bool:
+		# A number split at a chunk boundary ("12." + "5", "1e" + "3") would
+		# decode as its prefix; it is complete once a delimiter follows it.
+		end = self._pos
+		while end < len(self._buffer) and self._buffer[end] in _NUMBER_CHARS:
+			end += 1
+		return end < len(self._buffer) or self._eof
+
+	def _value(self) -> object:
+		if self._peek() in _NUMBER_CHARS:
+			while not self._number_complete():
+				self._fill()
+		while True:
+			try:
+				value, end = self._decoder.raw_decode(self._buffer, self._pos)
+			except json.JSONDecodeError:
+				# The value runs past the buffered text; read more and retry.
+				if not self._fill():
+					raise
+				continue
+			self._pos = end
+			return value
+
+	def _members(self) -> Iterator[Tuple[str, object]]:
+		self._expect("{")
+		if self._peek() == "}":
+			self._pos += 1
+			return
+		while True:
+			key = self._value()
+			self._expect(":")
+			yield key, self._value()
+			if self._peek() == "}":
+				self._pos += 1
+				return
+			self._expect(",")
+
+	def entries(self) -> Iterator[Tuple[str, str, object]]:
+		"""Yield ``(month, member, value)`` for every entry of every month."""
+
+		self._expect("{")
+		if self._peek() == "}":
+			return
+		while True:
+			month = self._value()
+			self._expect(":")
+			if self._peek() == "{":
+				for member, value in self._members():
+					yield month, member, value
+			else:
+				self._value()
+			if self._peek() == "}":
+				return
+			self._expect(",")
+
+
+def _iter_source_entries(path: Path) -> Iterator[Tuple[str, str, list]]:
+	"""Stream the member-month metric lists for ``TARGET_MONTHS`` from ``path``."""
+
+	with path.open("r", encoding="utf-8") as handle:
+		for month_key, name, member_payload in _ChunkedJsonReader(handle).entries():
+			month = _normalise_month_key(month_key)
+			if month in TARGET_MONTHS and name != "sprint_info" and isinstance(member_payload, list):
+				yield month, name, member_payload
+
+
+def _spill_source_entries(path: Path, db_path: Path) -> sqlite3.Connection:
+	"""Index the streamed entries by member in a scratch SQLite file."""
+
+	conn = sqlite3.connect(str(db_path))
+	conn.execute("PRAGMA journal_mode = OFF")
+	conn.execute("PRAGMA synchronous = OFF")
+	conn.execute(
+		"CREATE TABLE metrics (member TEXT NOT NULL, month TEXT NOT NULL, payload TEXT NOT NULL, "
+		"PRIMARY KEY (member, month))"
+	)
+	conn.executemany(
+		"INSERT OR REPLACE INTO metrics (member, month, payload) VALUES (?, ?, ?)",
+		((name, month, json.dumps(payload)) for month, name, payload in _iter_source_entries(path)),
+	)
+	conn.commit()
+	return conn
+
+
+def _iter_member_payloads_streamed(conn: sqlite3.Connection) -> Iterator[Tuple[str, Dict[str, dict]]]:
+	"""Yield ``(member, team_payload)`` where the payload holds only that member's months."""
+
+	member_names = [row[0] for row in conn.execute("SELECT DISTINCT member FROM metrics ORDER BY member")]
+	for member in member_names:
+		rows = conn.execute("SELECT month, payload FROM metrics WHERE member = ?", (member,))
+		yield member, {month: {member: json.loads(payload)} for month, payload in rows}
+
+
+def _iter_member_payloads_loaded(path: Path) -> Iterator[Tuple[str, Dict[str, dict]]]:
+	team_payload = _load_source_payload(path)
+	for member in _collect_member_names(team_payload):
+		yield member, team_payload
+
+
 def _parse_member_metrics(raw_metrics: Iterable[List[str]]) -> Dict[str, Optional[float]]:
 	metric_map: Dict[str, Optional[float]] = {}
 	for entry in raw_metrics:
@@ -158,7 +323,10 @@ def _build_sprint_velocity(member_name: str, team_payload: Dict[str, dict],) ->
 			{
 				"sprint": month,
 				"committed": round(sprint_committed, 2),
-				"delivered": round(total_delivered, 2) if month not in FINAL_EVAL_MONTHS else round(total_delivered * 100, 2)
+				"delivered": round(total_delivered, 2) if month not in FINAL_EVAL_MONTHS else round(total_delivered * 100, 2),
+				# Not tracked in the Excel source; required by the report schema and
+				# matching the default the DOC report already assumes.
+				"plagiarism": "No",
 			}
 		)
 	
@@ -188,6 +356,15 @@ def _slugify_member(name: str) -> str:
 	return "_".join(name.lower().split())
 
 
+def _display_path(path: Path) -> Path:
+	"""Show paths under the repository relative to it, others as given."""
+
+	try:
+		return path.relative_to(BASE_DIR)
+	except ValueError:
+		return path
+
+
 def _build_member_payload(member_name: str, team_payload: Dict[str, dict]) -> Dict[str, object]:
 	monthly_progress = _build_monthly_progress(member_name, team_payload)
 	sprint_velocity = _build_sprint_velocity(member_name, team_payload)
@@ -213,7 +390,7 @@ def _build_member_payload(member_name: str, team_payload: Dict[str, dict]) -> Di
 
 	return {
 		"employee_name": member_name,
-		"team": "Team Code Orbit (AIOps)",
+		"team": TEAM_NAME,
 		"evaluation_period": _evaluation_period(monthly_progress),
 		"generation_date": datetime.utcnow().isoformat(timespec="seconds") + "Z",
 		"attendance_summary": {
@@ -233,26 +410,107 @@ def _build_member_payload(member_name: str, team_payload: Dict[str, dict]) -> Di
 	}
 
 
-def generate_member_reports() -> None:
+def generate_member_reports(journal=None, members: Optional[Iterable[str]] = None) -> None:
+	"""Write one report JSON per member found in ``SOURCE_JSON``.
+
+	When a ``CheckpointJournal`` is given, members already exported from an
+	unchanged source file are skipped and each outcome is recorded. ``members``
+	optionally restricts the export to the given report stems
+	(e.g. ``hanan_aljabri_report``). With ``STREAM_SOURCE`` the source is
+	parsed incrementally, members are built one at a time and the peak traced
+	memory of the export is printed at the end.
+	"""
+
 	if not SOURCE_JSON.exists():
 		raise FileNotFoundError(f"Source data not found at {SOURCE_JSON}")
 
 	OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-	team_payload = _load_source_payload(SOURCE_JSON)
-	member_names = _collect_member_names(team_payload)
-
-	for member in member_names:
-		payload = _build_member_payload(member, team_payload)
+	# Tracing slows allocation-heavy code, so only the streaming mode, whose
+	# point is the lower peak, pays for it.
+	started_tracing = STREAM_SOURCE and not tracemalloc.is_tracing()
+	if started_tracing:
+		tracemalloc.start()
+	if STREAM_SOURCE:
+		tracemalloc.reset_peak()
+
+	with tempfile.TemporaryDirectory(prefix="eval_report_stream_") as scratch_dir:
+		if STREAM_SOURCE:
+			conn = _spill_source_entries(SOURCE_JSON, Path(scratch_dir) / "metrics.sqlite3")
+			member_payloads = _iter_member_payloads_streamed(conn)
+		else:
+			conn = None
+			member_payloads = _iter_member_payloads_loaded(SOURCE_JSON)
+		try:
+			_export_member_payloads(member_payloads, journal, members)
+		finally:
+			if conn is not None:
+				conn.close()
+
+	if STREAM_SOURCE:
+		_, peak = tracemalloc.get_traced_memory()
+		if started_tracing:
+			tracemalloc.stop()
+		print(f"Peak traced memory (streaming source): {peak / (1024 * 1024):.1f} MiB")
+
+
+def _export_member_payloads(
+	member_payloads: Iterator[Tuple[str, Dict[str, dict]]],
+	journal=None,
+	members: Optional[Iterable[str]] = None,
+) -> None:
+	# The team label and month selection shape every report, so changing them
+	# must invalidate the checkpoints as much as a new aggregate does.
+	fingerprint = stage_fingerprint(SOURCE_JSON, settings={
+		'team_name': TEAM_NAME,
+		'target_months': list(TARGET_MONTHS),
+		'final_eval_months': list(FINAL_EVAL_MONTHS),
+	})
+	writer = get_writer()
+	queued: List[tuple] = []
+
+	for member, team_payload in member_payloads:
+		if members is not None and f"{_slugify_member(member)}_report" not in members:
+			continue
 		filename = f"{_slugify_member(member)}_report.json"
 		output_path = OUTPUT_DIR / filename
-		with output_path.open("w", encoding="utf-8") as handle:
-			json.dump(payload, handle, ensure_ascii=False, indent=2)
-		print(f"Generated {output_path.relative_to(BASE_DIR)}")
+		if journal and journal.is_done(STAGE_EVAL_REPORT_JSON, member, fingerprint) and output_path.exists():
+			print(f"Skipping (checkpointed) {_display_path(output_path)}")
+			continue
+		try:
+			payload = _build_member_payload(member, team_payload)
+			writer.write_json(output_path, payload, indent=2)
+		except Exception as exc:
+			if not journal:
+				raise
+			print(f"Failed to generate report JSON for {member}: {exc}")
+			journal.record(STAGE_EVAL_REPORT_JSON, member, False, fingerprint, exc)
+			continue
+		queued.append((member, output_path))
+		print(f"Generated {_display_path(output_path)}")
+		if len(queued) >= RECORD_BATCH_SIZE:
+			_record_written(queued, journal, fingerprint)
+			queued = []
+
+	_record_written(queued, journal, fingerprint)
+
+
+def _record_written(queued: List[tuple], journal, fingerprint: str) -> None:
+	"""Flush queued report writes and record each member's outcome."""
+
+	failures = flush_writes()
+	for member, output_path in queued:
+		error = failures.get(output_path)
+		if error:
+			print(f"Failed to write {_display_path(output_path)}: {error}")
+		if journal:
+			journal.record(STAGE_EVAL_REPORT_JSON, member, error is None, fingerprint, error)
+	if failures and not journal:
+		raise next(iter(failures.values()))
 
 
-def main():
-		generate_member_reports()
+def main(journal=None, members=None):
+		generate_member_reports(journal, members)
 
 
 if __name__ == "__main__":
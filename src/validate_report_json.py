@@ -0,0 +1,253 @@
+"""Validate the individual report JSONs against ``schema/report_schema.json``.
+
+Runs between stage 2 and rendering so a malformed payload stops the pipeline
+before any Jinja2, Chromium or python-docx work is spent on it. The schema is
+compiled once into nested Python closures (one per schema node, with every
+keyword resolved up front), so validating a report is a handful of type checks
+and dict lookups rather than a walk over the schema document.
+
+Only the JSON Schema keywords the report schema uses are supported; compiling
+a schema with any other keyword raises ``ValueError`` rather than silently
+skipping the constraint.
+"""
+
+import json
+import time
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SCHEMA_PATH = BASE_DIR / 'schema' / 'report_schema.json'
+JSON_DIR = BASE_DIR / 'transformed_data' / 'individual_reports'
+
+# Keywords that only document the schema.
+ANNOTATION_KEYWORDS = {'$schema', '$id', 'title', 'description', 'examples', 'default', '$comment'}
+
+_TYPE_CHECKS = {
+    'object': lambda value: isinstance(value, dict),
+    'array': lambda value: isinstance(value, list),
+    'string': lambda value: isinstance(value, str),
+    'boolean': lambda value: isinstance(value, bool),
+    'null': lambda value: value is None,
+    'number': lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    'integer': lambda value: (isinstance(value, int) and not isinstance(value, bool))
+                             or (isinstance(value, float) and value.is_integer()),
+}
+
+
+def _is_date_time(value):
+    try:
+        datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return False
+    return 'T' in value or ' ' in value
+
+
+def _is_date(value):
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+_FORMAT_CHECKS = {
+    'date-time': _is_date_time,
+    'date': _is_date,
+}
+
+
+def _format_path(path):
+    text = '$'
+    for part in path:
+        text += f'[{part}]' if isinstance(part, int) else f'.{part}'
+    return text
+
+
+def _compile_node(schema):
+    """Compile one schema node into ``check(value, path, errors)``."""
+    unsupported = set(schema) - ANNOTATION_KEYWORDS - {
+        'type', 'properties', 'required', 'items', 'enum', 'format', 'additionalProperties',
+        'minimum', 'maximum', 'minItems', 'maxItems', 'minLength',
+    }
+    if unsupported:
+        raise ValueError(f"Unsupported schema keyword(s): {sorted(unsupported)}")
+
+    checks = []
+
+    if 'type' in schema:
+        types = schema['type'] if isinstance(schema['type'], list) else [schema['type']]
+        type_checks = [_TYPE_CHECKS[name] for name in types]
+        is_expected_type = type_checks[0] if len(type_checks) == 1 else \
+            (lambda value: any(type_check(value) for type_check in type_checks))
+        expected = ' or '.join(types)
+
+        def check_type(value, path, errors):
+            if not is_expected_type(value):
+                errors.append(f"{_format_path(path)}: expected {expected}, got {type(value).__name__}")
+                return False
+            return True
+        checks.append(check_type)
+
+    if 'enum' in schema:
+        allowed = schema['enum']
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(f"{_format_path(path)}: {value!r} is not one of {allowed}")
+            return True
+        checks.append(check_enum)
+
+    if 'format' in schema:
+        format_name = schema['format']
+        if format_name not in _FORMAT_CHECKS:
+            raise ValueError(f"Unsupported schema format {format_name!r}; supported: {sorted(_FORMAT_CHECKS)}")
+        format_check = _FORMAT_CHECKS[format_name]
+
+        def check_format(value, path, errors):
+            if isinstance(value, str) and not format_check(value):
+                errors.append(f"{_format_path(path)}: {value!r} is not a valid {format_name}")
+            return True
+        checks.append(check_format)
+
+    if 'minLength' in schema:
+        min_length = schema['minLength']
+
+        def check_min_length(value, path, errors):
+            if isinstance(value, str) and len(value) < min_length:
+                errors.append(f"{_format_path(path)}: shorter than {min_length} character(s)")
+            return True
+        checks.append(check_min_length)
+
+    if 'minimum' in schema or 'maximum' in schema:
+        minimum, maximum = schema.get('minimum'), schema.get('maximum')
+
+        def check_range(value, path, errors):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                if minimum is not None and value < minimum:
+                    errors.append(f"{_format_path(path)}: {value} is less than {minimum}")
+                if maximum is not None and value > maximum:
+                    errors.append(f"{_format_path(path)}: {value} is greater than {maximum}")
+            return True
+        checks.append(check_range)
+
+    if 'required' in schema or 'properties' in schema or 'additionalProperties' in schema:
+        required = tuple(schema.get('required', ()))
+        properties = {name: _compile_node(sub) for name, sub in schema.get('properties', {}).items()}
+        additional = schema.get('additionalProperties', True)
+        additional_check = _compile_node(additional) if isinstance(additional, dict) else None
+
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return True
+            for name in required:
+                if name not in value:
+                    errors.append(f"{_format_path(path)}: missing required property '{name}'")
+            for name, item in value.items():
+                property_check = properties.get(name)
+                if property_check is not None:
+                    property_check(item, path + (name,), errors)
+                elif additional is False:
+                    errors.append(f"{_format_path(path)}: unexpected property '{name}'")
+                elif additional_check is not None:
+                    additional_check(item, path + (name,), errors)
+            return True
+        checks.append(check_object)
+
+    if 'items' in schema or 'minItems' in schema or 'maxItems' in schema:
+        item_check = _compile_node(schema['items']) if 'items' in schema else None
+        min_items, max_items = schema.get('minItems'), schema.get('maxItems')
+
+        def check_array(value, path, errors):
+            if not isinstance(value, list):
+                return True
+            if min_items is not None and len(value) < min_items:
+                errors.append(f"{_format_path(path)}: fewer than {min_items} item(s)")
+            if max_items is not None and len(value) > max_items:
+                errors.append(f"{_format_path(path)}: more than {max_items} item(s)")
+            if item_check is not None:
+                for index, item in enumerate(value):
+                    item_check(item, path + (index,), errors)
+            return True
+        checks.append(check_array)
+
+    def check(value, path, errors):
+        # A type mismatch makes the remaining checks meaningless for this node.
+        for node_check in checks:
+            if not node_check(value, path, errors):
+                return
+    return check
+
+
+def compile_schema(schema):
+    """Compile a schema dict into ``validate(data) -> list of error messages``."""
+    root_check = _compile_node(schema)
+
+    def validate(data):
+        errors = []
+        root_check(data, (), errors)
+        return errors
+    return validate
+
+
+@lru_cache(maxsize=None)
+def load_validator(schema_path=None):
+    """Return the compiled validator for ``schema_path``; compiled once per process."""
+    with open(schema_path or SCHEMA_PATH, 'r', encoding='utf-8') as schema_file:
+        return compile_schema(json.load(schema_file))
+
+
+def validate_report(data):
+    """Validate one report payload; returns a list of error messages."""
+    return load_validator(str(SCHEMA_PATH))(data)
+
+
+def validate_reports(members=None):
+    """
+    Validates every report JSON in ``JSON_DIR`` in one batch.
+
+    :param members: Optional collection of report stems to restrict validation to.
+    :return: Tuple of (number of reports checked, ``{report stem: [errors]}``
+        for the invalid ones).
+    """
+    validator = load_validator(str(SCHEMA_PATH))
+    invalid = {}
+    checked = 0
+    for json_file in sorted(Path(JSON_DIR).glob('*.json')):
+        if members is not None and json_file.stem not in members:
+            continue
+        checked += 1
+        try:
+            with open(json_file, 'r', encoding='utf-8') as handle:
+                errors = validator(json.load(handle))
+        except json.JSONDecodeError as e:
+            errors = [f"not valid JSON: {e}"]
+        if errors:
+            invalid[json_file.stem] = errors
+    return checked, invalid
+
+
+def main(journal=None, members=None):
+    """
+    Validates the report JSONs and lists every problem found.
+
+    :param journal: Unused; validation is cheap enough to always run in full.
+    :param members: Optional collection of report stems to restrict validation to.
+    :return: ``{report stem: [errors]}`` for the invalid reports.
+    """
+    started = time.perf_counter()
+    checked, invalid = validate_reports(members)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    for member, errors in invalid.items():
+        print(f"✗ {member}.json")
+        for error in errors:
+            print(f"    {error}")
+    print(f"Validated {checked} report(s) in {elapsed_ms:.1f} ms: {checked - len(invalid)} valid, {len(invalid)} invalid")
+    return invalid
+
+
+if __name__ == '__main__':
+    main()